@@ -0,0 +1,53 @@
+import random
+from pathlib import Path
+from typing import Dict
+
+from pubmed_fetcher import mockserver
+from pubmed_fetcher.mockserver import article_set, author_element, pubmed_article
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# A realistic mix: company, academic, hospital and mixed affiliations.
+AFFILIATIONS = [
+    "Genentech Inc., South San Francisco, CA, USA.",
+    "Novartis Pharma AG, Basel, Switzerland.",
+    "Roche Diagnostics GmbH, Penzberg, Germany.",
+    "Department of Biology, Stanford University, Stanford, CA, USA.",
+    "Department of Physics, Princeton University, Princeton, NJ, USA.",
+    "Massachusetts General Hospital, Boston, MA, USA.",
+    "Health Bureau of Sichuan Province, Chengdu, China.",
+    "Amgen Research Institute, Thousand Oaks, CA, USA.",
+    "Harvard Medical School, Boston, MA, USA.",
+    "BioNTech SE, Mainz, Germany.",
+]
+
+
+def recorded_articles() -> Dict[str, str]:
+    """PMID -> ``<PubmedArticle>`` XML from the checked-in EFetch payloads."""
+    return mockserver.recorded_articles(REPO_ROOT)
+
+
+def synthetic_article(pmid: int, rng: random.Random, authors: int = 8) -> str:
+    """A synthetic article whose authors' affiliations are drawn from :data:`AFFILIATIONS` with ``rng``."""
+    return pubmed_article(
+        pmid,
+        [author_element(f"Author{i}", rng.choice(AFFILIATIONS)) for i in range(authors)],
+        title=f"Synthetic article {pmid} on CRISPR screening.",
+        abstract="Lorem ipsum dolor sit amet. " * 40
+    )
+
+
+def synthetic_articles(count: int, start: int = 50000000, seed: int = 0) -> Dict[str, str]:
+    """PMID -> synthetic article for ``count`` consecutive PMIDs, the same for the same ``seed``."""
+    rng = random.Random(seed)
+    return {str(start + i): synthetic_article(start + i, rng) for i in range(count)}
+
+
+def recorded_payload(copies: int) -> bytes:
+    """The recorded articles repeated ``copies`` times as one ``PubmedArticleSet``."""
+    return article_set(*list(recorded_articles().values()) * copies).encode("utf-8")
+
+
+def synthetic_payload(count: int, start: int = 50000000, seed: int = 0) -> bytes:
+    return article_set(*synthetic_articles(count, start, seed).values()).encode("utf-8")
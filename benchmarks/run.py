@@ -0,0 +1,184 @@
+"""Throughput and peak-memory benchmarks for the fetch, parse, classify and write hot paths.
+
+Run from the repository root::
+
+    python -m benchmarks.run                      # print a table
+    python -m benchmarks.run --json results.json  # also save the numbers
+    python -m benchmarks.run --compare results.json --tolerance 0.2
+
+Every benchmark replays the recorded ``debug_*.xml`` EFetch payloads or a
+synthetic ``PubmedArticleSet``; nothing touches the network. With
+``--compare`` the run exits non-zero if any benchmark's throughput fell by
+more than ``--tolerance`` against the saved baseline.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.fixtures import AFFILIATIONS, recorded_articles, recorded_payload, synthetic_articles, synthetic_payload
+from pubmed_fetcher.mockserver import article_set
+from pubmed_fetcher.classifier import classify_affiliations, is_company_affiliation
+from pubmed_fetcher.parser import iter_articles, parse_article
+from pubmed_fetcher.pubmed_fetcher import fetch_paper_details
+from pubmed_fetcher.sinks import CsvSink
+
+
+class ReplayResponse:
+    def __init__(self, payload: bytes):
+        self.raw = io.BytesIO(payload)
+
+
+class ReplayClient:
+    """Stands in for :class:`EutilsClient`, answering EFetch from in-memory articles."""
+
+    def __init__(self, articles: Dict[str, str]):
+        self.articles = articles
+
+    def post_stream(self, url, consume, data=None, **kwargs):
+        ids = data["id"].split(",")
+        return consume(ReplayResponse(article_set(*(self.articles[pmid] for pmid in ids)).encode("utf-8")))
+
+
+# Each setup takes (scale, scratch directory) and returns (work, number of items the work processes).
+Setup = Callable[[int, Path], Tuple[Callable[[], object], int]]
+
+
+def parse_recorded(scale: int, directory: Path):
+    payload = recorded_payload(copies=50 * scale)
+    count = len(recorded_articles()) * 50 * scale
+    return lambda: sum(1 for article in iter_articles(io.BytesIO(payload)) if parse_article(article, include_academic=True)), count
+
+
+def parse_synthetic(scale: int, directory: Path):
+    count = 2000 * scale
+    payload = synthetic_payload(count)
+    return lambda: sum(1 for article in iter_articles(io.BytesIO(payload)) if parse_article(article, include_academic=True)), count
+
+
+def classify_cold(scale: int, directory: Path):
+    # Distinct strings, so every call misses the memo and runs the regexes.
+    affiliations = [f"{AFFILIATIONS[i % len(AFFILIATIONS)]} Unit {i}." for i in range(20000 * scale)]
+
+    def work():
+        is_company_affiliation.cache_clear()
+        return classify_affiliations(affiliations)
+
+    return work, len(affiliations)
+
+
+def classify_warm(scale: int, directory: Path):
+    affiliations = AFFILIATIONS * (20000 * scale // len(AFFILIATIONS))
+    classify_affiliations(affiliations)
+    return lambda: classify_affiliations(affiliations), len(affiliations)
+
+
+def write_csv(scale: int, directory: Path):
+    payload = synthetic_payload(2000 * scale)
+    papers = [parse_article(article, include_academic=True) for article in iter_articles(io.BytesIO(payload))]
+
+    def work():
+        with CsvSink(directory / "papers.csv") as sink:
+            for start in range(0, len(papers), 200):
+                sink.write(papers[start:start + 200])
+
+    return work, len(papers)
+
+
+def fetch_pipeline(scale: int, directory: Path):
+    articles = synthetic_articles(1000 * scale)
+    client = ReplayClient(articles)
+
+    def work():
+        return fetch_paper_details(list(articles), client=client)
+
+    return work, len(articles)
+
+
+BENCHMARKS: Dict[str, Setup] = {
+    "parse_recorded": parse_recorded,
+    "parse_synthetic": parse_synthetic,
+    "classify_cold": classify_cold,
+    "classify_warm": classify_warm,
+    "write_csv": write_csv,
+    "fetch_pipeline": fetch_pipeline,
+}
+
+
+def measure(setup: Setup, scale: int = 1, repeat: int = 3) -> Dict[str, float]:
+    """Best-of-``repeat`` throughput, plus peak traced memory from one extra run."""
+    with tempfile.TemporaryDirectory(prefix="pubmed_bench_") as directory, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        work, count = setup(scale, Path(directory))
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            work()
+            timings.append(time.perf_counter() - start)
+
+        # Tracing slows the run down, so memory is measured separately from time.
+        tracemalloc.start()
+        work()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {"items": count, "seconds": best, "items_per_s": count / best, "peak_mib": peak / 2 ** 20}
+
+
+def run(names: List[str], scale: int = 1, repeat: int = 3) -> Dict[str, Dict[str, float]]:
+    return {name: measure(BENCHMARKS[name], scale=scale, repeat=repeat) for name in names}
+
+
+def regressions(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]], tolerance: float) -> List[str]:
+    """Names of benchmarks whose throughput fell more than ``tolerance`` below ``baseline``."""
+    return [
+        name for name, result in results.items()
+        if name in baseline and result["items_per_s"] < baseline[name]["items_per_s"] * (1 - tolerance)
+    ]
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("names", nargs="*", help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument("--scale", type=int, default=1, help="Multiply every workload size by this factor")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the fastest is reported")
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --json run")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed throughput drop against --compare")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run(args.names or list(BENCHMARKS), scale=args.scale, repeat=args.repeat)
+
+    print(f"{'benchmark':<18}{'items':>10}{'items/s':>14}{'peak MiB':>11}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['items']:>10}{result['items_per_s']:>14,.0f}{result['peak_mib']:>11.1f}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        slower = regressions(results, baseline, args.tolerance)
+        for name in slower:
+            print(f"❌ {name}: {results[name]['items_per_s']:,.0f}/s vs baseline {baseline[name]['items_per_s']:,.0f}/s")
+        if slower:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1 @@
-"# This marks the directory as a package" 
+from pubmed_fetcher.pubmed_fetcher import fetch_pubmed_ids, iter_pubmed_ids, fetch_paper_details, iter_paper_details, save_to_csv
@@ -0,0 +1,103 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from pubmed_fetcher.cache import ArticleCache
+from pubmed_fetcher.client import EutilsClient, get_default_client
+from pubmed_fetcher.index import ArticleIndex
+from pubmed_fetcher.organizations import OrganizationResolver
+from pubmed_fetcher.pubmed_fetcher import EFETCH_BATCH_SIZE, fetch_paper_details, fetch_pubmed_ids
+from pubmed_fetcher.records import PaperRecord
+
+
+# Extra output column listing every query of the batch that found the paper.
+QUERY_COLUMN = "Matched Queries"
+
+# Longest query prefix kept in a per-query output file name.
+MAX_SLUG_LENGTH = 40
+
+
+def read_queries(path: Union[str, Path]) -> List[str]:
+    """Read one query per line, skipping blank lines, ``#`` comments and repeats."""
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith("#") and query not in queries:
+                queries.append(query)
+    return queries
+
+
+def search_queries(
+    queries: Iterable[str],
+    max_results: Optional[int] = 10,
+    client: Optional[EutilsClient] = None,
+    concurrency: int = 4
+) -> Dict[str, List[str]]:
+    """Run the esearch for every query, ``concurrency`` at a time.
+
+    Returns the PubMed IDs of each query, keyed and ordered by query. The
+    requests share ``client``, so its rate limit still applies overall.
+    """
+    client = client or get_default_client()
+    queries = list(queries)
+    with ThreadPoolExecutor(max(1, concurrency)) as pool:
+        hits = pool.map(lambda query: fetch_pubmed_ids(query, max_results=max_results, client=client), queries)
+        return dict(zip(queries, hits))
+
+
+def query_membership(hits: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Invert ``query -> PMIDs`` into ``PMID -> queries``, PMIDs in first-seen order."""
+    membership: Dict[str, List[str]] = {}
+    for query, pmids in hits.items():
+        for pmid in pmids:
+            membership.setdefault(pmid, []).append(query)
+    return membership
+
+
+def fetch_query_batch(
+    queries: Iterable[str],
+    max_results: Optional[int] = 10,
+    batch_size: int = EFETCH_BATCH_SIZE,
+    client: Optional[EutilsClient] = None,
+    cache: Optional[ArticleCache] = None,
+    index: Optional[ArticleIndex] = None,
+    organizations: Optional[OrganizationResolver] = None,
+    workers: int = 0,
+    concurrency: int = 4
+) -> Tuple[List[PaperRecord], Dict[str, List[str]]]:
+    """Search every query, then fetch the union of their hits once.
+
+    Returns the papers with non-academic authors, in first-seen order, and
+    the ``PMID -> queries`` membership used to fan them back out with
+    :func:`papers_by_query`.
+    """
+    hits = search_queries(queries, max_results=max_results, client=client, concurrency=concurrency)
+    membership = query_membership(hits)
+
+    total = sum(len(pmids) for pmids in hits.values())
+    print(f"🔗 {len(hits)} queries matched {total} PubMed IDs, {len(membership)} unique")
+
+    papers = fetch_paper_details(membership, batch_size=batch_size, client=client, cache=cache, index=index, organizations=organizations, workers=workers)
+    return papers, membership
+
+
+def papers_by_query(papers: List[PaperRecord], membership: Dict[str, List[str]]) -> Dict[str, List[PaperRecord]]:
+    """Split ``papers`` per query; a paper found by several queries is in each list."""
+    grouped: Dict[str, List[PaperRecord]] = {}
+    for paper in papers:
+        for query in membership.get(paper.pmid, ()):
+            grouped.setdefault(query, []).append(paper)
+    return grouped
+
+
+def membership_rows(papers: List[PaperRecord], membership: Dict[str, List[str]], affiliation_list: bool = False) -> List[Dict]:
+    """Flatten ``papers`` to output rows with an added :data:`QUERY_COLUMN`."""
+    return [{**paper.to_row(affiliation_list), QUERY_COLUMN: "; ".join(membership.get(paper.pmid, ()))} for paper in papers]
+
+
+def query_output_path(directory: Union[str, Path], position: int, query: str, suffix: str = ".csv") -> Path:
+    """Per-query output file, e.g. ``001-crispr-cas9.csv``, numbered by position in the batch."""
+    slug = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")[:MAX_SLUG_LENGTH].rstrip("-")
+    return Path(directory) / f"{position:03d}-{slug or 'query'}{suffix}"
@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+from pubmed_fetcher.metrics import METRICS
+
+
+DEFAULT_CACHE_DIR = "~/.cache/pubmed_fetcher"
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_BYTES = 1024 ** 3
+
+
+class ArticleCache:
+    """On-disk cache of raw ``PubmedArticle`` XML keyed by PMID.
+
+    Entries are zlib-compressed in a single SQLite file. Entries older than
+    ``ttl`` seconds are treated as misses, and once the compressed total
+    exceeds ``max_bytes`` the least recently read entries are evicted.
+    ``hits`` and ``misses`` count lookups over the cache's lifetime.
+    The cache is safe to share between the threads of one process.
+    """
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_CACHE_DIR, ttl: float = DEFAULT_TTL, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.directory / "articles.sqlite3", check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " pmid TEXT PRIMARY KEY,"
+            " xml BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at)")
+        self._db.commit()
+
+    def get_many(self, pmids: Iterable[str]) -> Dict[str, bytes]:
+        """Return the cached, unexpired XML for whichever of ``pmids`` are present."""
+        pmids = list(pmids)
+        if not pmids:
+            return {}
+
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(pmids), 500):
+                chunk = pmids[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._db.execute(
+                    f"SELECT pmid, xml FROM articles WHERE pmid IN ({placeholders}) AND fetched_at >= ?",
+                    (*chunk, now - self.ttl)
+                )
+                found.update((pmid, zlib.decompress(xml)) for pmid, xml in rows)
+
+            if found:
+                self._db.executemany("UPDATE articles SET accessed_at = ? WHERE pmid = ?", ((now, pmid) for pmid in found))
+                self._db.commit()
+
+            self.hits += len(found)
+            self.misses += len(pmids) - len(found)
+
+        METRICS.increment("cache_hits", len(found))
+        METRICS.increment("cache_misses", len(pmids) - len(found))
+
+        return found
+
+    def put_many(self, articles: Dict[str, bytes]):
+        """Store raw article XML, replacing older copies, then evict down to ``max_bytes``."""
+        if not articles:
+            return
+
+        now = time.time()
+        rows = []
+        for pmid, xml in articles.items():
+            compressed = zlib.compress(xml)
+            rows.append((pmid, compressed, len(compressed), now, now))
+
+        with self._lock:
+            self._db.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?)", rows)
+            self._evict()
+            self._db.commit()
+
+    def discard_many(self, pmids: Iterable[str]):
+        """Drop any cached copies of ``pmids``, e.g. because PubMed has revised them."""
+        pmids = list(pmids)
+        with self._lock:
+            self._db.executemany("DELETE FROM articles WHERE pmid = ?", ((pmid,) for pmid in pmids))
+            self._db.commit()
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        doomed = []
+        for pmid, size in self._db.execute("SELECT pmid, size FROM articles ORDER BY accessed_at"):
+            doomed.append((pmid,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM articles WHERE pmid = ?", doomed)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ArticleCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
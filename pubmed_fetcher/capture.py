@@ -0,0 +1,92 @@
+import gzip
+import queue
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+DEFAULT_CAPTURE_DIR = "debug_payloads"
+
+
+class DebugCapture:
+    """Save raw EFetch payloads for debugging, off the fetch thread.
+
+    Articles go to ``directory`` as gzipped ``<pmid>.xml.gz`` files, written
+    by one background thread so the pipeline never waits on disk. Only one
+    PMID in ``sample`` is kept (chosen by a hash, so the same PMIDs are
+    captured on every run), or none with ``failures_only``. Batches that
+    failed to parse are always captured whole. If the writer falls more
+    than ``max_pending`` files behind, new captures are dropped and counted
+    in ``dropped`` rather than blocking. Files that cannot be written
+    (disk full, no permission) are counted in ``failed`` and skipped.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = DEFAULT_CAPTURE_DIR,
+        sample: int = 1,
+        failures_only: bool = False,
+        compress: bool = True,
+        max_pending: int = 1000
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sample = max(1, sample)
+        self.failures_only = failures_only
+        self.compress = compress
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="debug-capture", daemon=True)
+        self._thread.start()
+
+    def wants(self, pmid: str) -> bool:
+        return not self.failures_only and zlib.crc32(pmid.encode("utf-8")) % self.sample == 0
+
+    def articles(self, articles: Dict[str, bytes]):
+        """Queue the sampled subset of freshly fetched articles."""
+        for pmid, xml in articles.items():
+            if self.wants(pmid):
+                self._submit(f"{pmid}.xml", xml)
+
+    def failure(self, label: str, error: str, payload: bytes):
+        """Queue a payload that failed to parse, with the error alongside it."""
+        self._submit(f"failed_{label}.xml", payload)
+        self._submit(f"failed_{label}.error.txt", error.encode("utf-8"))
+
+    def _submit(self, name: str, data: bytes):
+        try:
+            self._queue.put_nowait((name, data))
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            name, data = item
+            try:
+                if self.compress:
+                    (self.directory / f"{name}.gz").write_bytes(gzip.compress(data, compresslevel=5))
+                else:
+                    (self.directory / name).write_bytes(data)
+            except OSError:
+                self.failed += 1
+            else:
+                self.written += 1
+
+    def close(self):
+        """Finish writing everything queued so far and stop the writer."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def __enter__(self) -> "DebugCapture":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
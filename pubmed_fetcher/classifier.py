@@ -0,0 +1,39 @@
+import re
+from functools import lru_cache
+from typing import Iterable, List
+
+
+# Define keywords to detect companies and filter out universities
+COMPANY_KEYWORDS = ["inc", "pharma", "biotech", "corp", "ltd", "gmbh", "s.a.", "research institute", "therapeutics", "biosciences"]
+ACADEMIC_KEYWORDS = ["university", "college", "school", "institute of technology", "hospital", "med school"]
+
+
+def keyword_pattern(keywords: Iterable[str]) -> str:
+    """Build one regex that matches any of ``keywords`` at the start of a word.
+
+    Keywords may run on into a longer word ("pharma" matches
+    "Pharmaceuticals") but never start mid-word, so "inc" no longer matches
+    "Princeton" and "s.a." no longer matches "U.S.A.". Longer keywords are
+    tried first so an alternation never stops at a shorter prefix.
+    """
+    alternatives = "|".join(re.escape(word) for word in sorted(keywords, key=len, reverse=True))
+    return rf"(?<![\w.])(?:{alternatives})"
+
+
+COMPANY_PATTERN = re.compile(keyword_pattern(COMPANY_KEYWORDS), re.IGNORECASE)
+ACADEMIC_PATTERN = re.compile(keyword_pattern(ACADEMIC_KEYWORDS), re.IGNORECASE)
+
+
+@lru_cache(maxsize=65536)
+def is_company_affiliation(affiliation: str) -> bool:
+    """True if ``affiliation`` names a company and no academic institution.
+
+    Verdicts are memoized, since the same affiliation strings recur across
+    authors and papers.
+    """
+    return COMPANY_PATTERN.search(affiliation) is not None and ACADEMIC_PATTERN.search(affiliation) is None
+
+
+def classify_affiliations(affiliations: Iterable[str]) -> List[bool]:
+    """Return :func:`is_company_affiliation` for each affiliation, in order."""
+    return [is_company_affiliation(affiliation) for affiliation in affiliations]
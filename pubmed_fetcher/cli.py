@@ -1,14 +1,95 @@
+import asyncio
+import cProfile
+import pstats
 import typer
-from pubmed_fetcher.pubmed_fetcher import fetch_pubmed_ids, fetch_paper_details, save_to_csv
+from pathlib import Path
+from typing import List
+from pubmed_fetcher.batch import fetch_query_batch, membership_rows, papers_by_query, query_output_path, read_queries
+from pubmed_fetcher.cache import ArticleCache, DEFAULT_CACHE_DIR
+from pubmed_fetcher.capture import DebugCapture, DEFAULT_CAPTURE_DIR
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.credentials import DEFAULT_CONFIG_PATH, load_credentials
+from pubmed_fetcher.index import ArticleIndex, DEFAULT_INDEX_PATH
+from pubmed_fetcher.ingest import iter_dump_files
+from pubmed_fetcher.journal import ProgressJournal
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.mockserver import MockEutilsServer
+from pubmed_fetcher.organizations import DEFAULT_ORGANIZATIONS_PATH, OrganizationResolver
+from pubmed_fetcher.incremental import DEFAULT_CHECKPOINT_DIR, QueryCheckpoint, fetch_incremental_ids, merge_results
+from pubmed_fetcher.pubmed_fetcher import iter_pubmed_ids, iter_paper_details, aiter_paper_details, EFETCH_BATCH_SIZE
+from pubmed_fetcher.rescore import AFFILIATION_COLUMN, read_table, rescore_table, write_table
+from pubmed_fetcher.service import DEFAULT_LRU_SIZE, PaperService
+from pubmed_fetcher.sinks import SINKS_BY_SUFFIX, MemorySink, Sink, open_sink, require_pyarrow
 
 
 app = typer.Typer()
 
+@app.callback()
+def run_options(
+    ctx: typer.Context,
+    metrics: str = typer.Option(None, "--metrics", help="Write stage timings and counters here at exit (.prom/.txt for Prometheus text, else JSON)"),
+    profile: str = typer.Option(None, "--profile", help="Run under cProfile and write a report, sorted by cumulative time, here")
+):
+
+    """Fetch and filter research papers from PubMed."""
+
+    METRICS.reset()
+    profiler = None
+    if profile:
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    def finish():
+        if profiler is not None:
+            profiler.disable()
+            with open(profile, "w", encoding="utf-8") as f:
+                pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(50)
+            typer.echo(f"⏱️ Profile written to {profile}")
+        if metrics:
+            METRICS.write(metrics)
+            typer.echo(f"📊 Metrics written to {metrics}")
+
+    ctx.call_on_close(finish)
+
+def _check_formats(*paths: str):
+    """Exit before doing any work if a Parquet file is named but pyarrow is missing."""
+    if any(path and str(path).lower().endswith(".parquet") for path in paths):
+        try:
+            require_pyarrow()
+        except ImportError as e:
+            typer.echo(f"❌ {e}")
+            raise typer.Exit(code=1)
+
+async def _drain(batches, sink: Sink):
+    async for papers in batches:
+        sink.write(papers)
+
 @app.command()
 def search(
     query: str = typer.Option(..., "--query", "-q", help="Search term for PubMed"),
-    file: str = typer.Option(None, "--file", "-f", help="Output file name"),
-    debug: bool = typer.Option(False, "--debug", "-d", help="Enable debug mode")
+    file: str = typer.Option(None, "--file", "-f", help="Output file name; .csv, .jsonl or .parquet picks the format"),
+    debug: bool = typer.Option(False, "--debug", "-d", help="Enable debug mode, capturing raw EFetch payloads"),
+    debug_dir: str = typer.Option(DEFAULT_CAPTURE_DIR, "--debug-dir", help="Where --debug saves gzipped raw payloads"),
+    debug_sample: int = typer.Option(1, "--debug-sample", help="With --debug, capture one article in N"),
+    debug_failures_only: bool = typer.Option(False, "--debug-failures-only", help="With --debug, only capture payloads that fail to parse"),
+    batch_size: int = typer.Option(EFETCH_BATCH_SIZE, "--batch-size", "-b", help="PubMed IDs per EFetch request"),
+    max_results: int = typer.Option(10, "--max-results", "-n", help="Maximum number of PubMed IDs to fetch"),
+    all_results: bool = typer.Option(False, "--all", help="Page through every search result, ignoring --max-results"),
+    concurrency: int = typer.Option(1, "--concurrency", "-c", help="EFetch batches in flight at once (>1 uses the async fetcher)"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Parse EFetch payloads in this many worker processes (0 parses in-process)"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Directory of the on-disk EFetch cache"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always fetch from PubMed and leave the cache untouched"),
+    index_path: str = typer.Option(DEFAULT_INDEX_PATH, "--index-path", help="SQLite index that every parsed article is added to"),
+    no_index: bool = typer.Option(False, "--no-index", help="Do not add parsed articles to the local index"),
+    organizations_path: str = typer.Option(DEFAULT_ORGANIZATIONS_PATH, "--organizations-path", help="SQLite table of affiliation strings resolved to company names"),
+    no_organizations: bool = typer.Option(False, "--no-organizations", help="Leave the Company Name(s) column empty instead of resolving it"),
+    incremental: bool = typer.Option(False, "--incremental", "-i", help="Only fetch articles added or revised since the last run and merge them into --file"),
+    checkpoint_dir: str = typer.Option(DEFAULT_CHECKPOINT_DIR, "--checkpoint-dir", help="Directory of the per-query incremental checkpoints"),
+    resume: bool = typer.Option(False, "--resume", "-r", help="Continue an interrupted run from the progress journal next to --file"),
+    api_key: str = typer.Option(None, "--api-key", help="NCBI API key (default: $NCBI_API_KEY or the config file); raises the rate limit to 10 req/s"),
+    email: str = typer.Option(None, "--email", help="Contact email sent to NCBI (default: $NCBI_EMAIL or the config file)"),
+    tool: str = typer.Option(None, "--tool", help="Tool name sent to NCBI (default: $NCBI_TOOL, the config file or pubmed_fetcher)"),
+    config: str = typer.Option(DEFAULT_CONFIG_PATH, "--config", help="INI file whose [ncbi] section holds api_key, email and tool")
 ):
 
     """Fetch and display PubMed papers based on a query, filtering for non-academic authors."""
@@ -18,24 +99,328 @@ def search(
     if debug:
         typer.echo(f"🔍 Searching for: {query}")
 
-    pubmed_ids = fetch_pubmed_ids(query)
+    if incremental and not file:
+        typer.echo("❌ --incremental needs --file to merge the new results into")
+        raise typer.Exit(code=1)
+    if resume and not file:
+        typer.echo("❌ --resume needs the --file of the interrupted run")
+        raise typer.Exit(code=1)
+    _check_formats(file)
 
-    if debug:
-        typer.echo(f"📄 Found PubMed IDs: {pubmed_ids}")
+    cache = None if no_cache else ArticleCache(cache_dir)
+    index = None if no_index else ArticleIndex(index_path)
+    organizations = None if no_organizations else OrganizationResolver(organizations_path)
+    capture = DebugCapture(debug_dir, sample=debug_sample, failures_only=debug_failures_only) if debug else None
+    checkpoint = QueryCheckpoint(checkpoint_dir, query) if incremental else None
+    journal = ProgressJournal(f"{file}.journal", resume=resume) if file else None
+
+    if journal is not None and journal.done:
+        typer.echo(f"⏩ Resuming: {len(journal.done)} PubMed IDs already done")
+
+    # Incremental runs merge a small delta into the existing file, so they collect in memory.
+    sink = open_sink(file) if file and not incremental else MemorySink()
+
+    credentials = load_credentials(api_key=api_key, email=email, tool=tool, config_path=config)
+
+    with EutilsClient(pool_size=max(10, concurrency), credentials=credentials) as client, sink:
+        typer.echo(f"🔑 NCBI rate tier: {client.tier}")
+        if checkpoint is not None:
+            pubmed_ids, run_date, complete = fetch_incremental_ids(query, checkpoint, client=client)
+            if cache is not None:
+                # These were added or revised since the last run; cached copies are stale.
+                cache.discard_many(pubmed_ids)
+        else:
+            pubmed_ids = iter_pubmed_ids(query, max_results=None if all_results else max_results, client=client)
+
+        if debug:
+            pubmed_ids = list(pubmed_ids)
+            typer.echo(f"📄 Found PubMed IDs: {pubmed_ids}")
+
+        if concurrency > 1:
+            batches = aiter_paper_details(pubmed_ids, batch_size=batch_size, concurrency=concurrency, client=client, cache=cache, journal=journal, index=index, capture=capture, organizations=organizations, workers=workers)
+            asyncio.run(_drain(batches, sink))
+        else:
+            for papers in iter_paper_details(pubmed_ids, batch_size=batch_size, client=client, cache=cache, journal=journal, index=index, capture=capture, organizations=organizations, workers=workers):
+                sink.write(papers)
+
+        if debug and client.retry_count:
+            typer.echo(f"🔁 Requests retried: {client.retry_count}")
+
+    if cache is not None:
+        typer.echo(f"🗄️ Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+    if index is not None:
+        index.close()
+
+    if organizations is not None:
+        typer.echo(f"🏢 Company names: {organizations.hits} known, {organizations.misses} newly resolved")
+        organizations.close()
+
+    if capture is not None:
+        capture.close()
+        typer.echo(f"🐞 Captured {capture.written} payload files in {debug_dir} ({capture.dropped} dropped, {capture.failed} failed)")
+
+    if journal is not None:
+        journal.discard()
+
+    if checkpoint is not None:
+        write_table(merge_results(file, sink.records, pubmed_ids), file)
+        typer.echo(f"✅ Merged {sink.count} new or revised papers into {file}")
+        if complete:
+            checkpoint.save(run_date, pubmed_ids)
+        else:
+            typer.echo(f"⚠️ Checkpoint not advanced: the search was cut off at {len(pubmed_ids)} IDs, narrow the query to fetch the rest")
+        return
+
+    if not sink.count:
+        typer.echo("❌ No relevant papers found with non-academic authors.")
+        return
+
+    if file:
+        typer.echo(f"✅ {sink.count} results saved to {file}")
+    else:
+        typer.echo("📄 Retrieved Papers:")
+        for paper in sink.records:
+            typer.echo(paper.to_row())
+
+@app.command()
+def batch(
+    queries_file: str = typer.Argument(..., help="Text file with one PubMed query per line (# starts a comment)"),
+    output_dir: str = typer.Option("batch_results", "--output-dir", "-o", help="Directory for the per-query result files"),
+    output_format: str = typer.Option("csv", "--format", help="Per-query file format: csv, jsonl or parquet"),
+    file: str = typer.Option(None, "--file", "-f", help="Also write every paper once, with all its matching queries, here"),
+    batch_size: int = typer.Option(EFETCH_BATCH_SIZE, "--batch-size", "-b", help="PubMed IDs per EFetch request"),
+    max_results: int = typer.Option(10, "--max-results", "-n", help="Maximum number of PubMed IDs per query"),
+    all_results: bool = typer.Option(False, "--all", help="Page through every search result, ignoring --max-results"),
+    concurrency: int = typer.Option(4, "--concurrency", "-c", help="ESearch requests in flight at once"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Parse EFetch payloads in this many worker processes (0 parses in-process)"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Directory of the on-disk EFetch cache"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always fetch from PubMed and leave the cache untouched"),
+    index_path: str = typer.Option(DEFAULT_INDEX_PATH, "--index-path", help="SQLite index that every parsed article is added to"),
+    no_index: bool = typer.Option(False, "--no-index", help="Do not add parsed articles to the local index"),
+    organizations_path: str = typer.Option(DEFAULT_ORGANIZATIONS_PATH, "--organizations-path", help="SQLite table of affiliation strings resolved to company names"),
+    no_organizations: bool = typer.Option(False, "--no-organizations", help="Leave the Company Name(s) column empty instead of resolving it"),
+    api_key: str = typer.Option(None, "--api-key", help="NCBI API key (default: $NCBI_API_KEY or the config file); raises the rate limit to 10 req/s"),
+    email: str = typer.Option(None, "--email", help="Contact email sent to NCBI (default: $NCBI_EMAIL or the config file)"),
+    tool: str = typer.Option(None, "--tool", help="Tool name sent to NCBI (default: $NCBI_TOOL, the config file or pubmed_fetcher)"),
+    config: str = typer.Option(DEFAULT_CONFIG_PATH, "--config", help="INI file whose [ncbi] section holds api_key, email and tool")
+):
+
+    """Run many queries at once, fetching each paper only once however many queries find it."""
+
+    suffix = f".{output_format.lower().lstrip('.')}"
+    if suffix not in SINKS_BY_SUFFIX:
+        typer.echo(f"❌ Unsupported --format {output_format!r}; choose from {', '.join(s[1:] for s in SINKS_BY_SUFFIX)}")
+        raise typer.Exit(code=1)
+    _check_formats(suffix, file)
+
+    queries = read_queries(queries_file)
+    if not queries:
+        typer.echo(f"❌ No queries found in {queries_file}")
+        raise typer.Exit(code=1)
+
+    cache = None if no_cache else ArticleCache(cache_dir)
+    index = None if no_index else ArticleIndex(index_path)
+    organizations = None if no_organizations else OrganizationResolver(organizations_path)
+    credentials = load_credentials(api_key=api_key, email=email, tool=tool, config_path=config)
+
+    with EutilsClient(pool_size=max(10, concurrency), credentials=credentials) as client:
+        typer.echo(f"🔑 NCBI rate tier: {client.tier}")
+        papers, membership = fetch_query_batch(
+            queries, max_results=None if all_results else max_results, batch_size=batch_size,
+            client=client, cache=cache, index=index, organizations=organizations, workers=workers, concurrency=concurrency
+        )
+
+    if cache is not None:
+        typer.echo(f"🗄️ Cache: {cache.hits} hits, {cache.misses} misses")
+        cache.close()
+
+    if index is not None:
+        index.close()
+
+    if organizations is not None:
+        typer.echo(f"🏢 Company names: {organizations.hits} known, {organizations.misses} newly resolved")
+        organizations.close()
+
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    grouped = papers_by_query(papers, membership)
+    for position, query in enumerate(queries, start=1):
+        found = grouped.get(query, [])
+        target = query_output_path(output_dir, position, query, suffix)
+        with open_sink(target) as sink:
+            sink.write(membership_rows(found, membership, sink.affiliation_list))
+        typer.echo(f"📄 {query}: {len(found)} papers" + (f" saved to {target}" if found else ""))
 
-    papers = fetch_paper_details(pubmed_ids)
+    if file:
+        with open_sink(file) as sink:
+            sink.write(membership_rows(papers, membership, sink.affiliation_list))
 
     if not papers:
         typer.echo("❌ No relevant papers found with non-academic authors.")
         return
 
+    typer.echo(f"✅ {len(papers)} unique papers across {len(queries)} queries" + (f", all saved to {file}" if file else ""))
+
+@app.command()
+def rescore(
+    source: str = typer.Argument(..., help="CSV, JSON-lines or Parquet file of earlier results"),
+    output: str = typer.Option(None, "--output", "-o", help="Where to write the rescored table"),
+    in_place: bool = typer.Option(False, "--in-place", help="Overwrite SOURCE with the rescored table instead of writing to --output"),
+    column: str = typer.Option(AFFILIATION_COLUMN, "--column", help="Column holding the affiliation strings"),
+    only_non_academic: bool = typer.Option(False, "--only-non-academic", help="Drop rows that no longer classify as non-academic")
+):
+
+    """Re-classify affiliations in saved results with the current keyword lists, without touching the network."""
+
+    if not (output or in_place):
+        typer.echo("❌ Pass --output for the rescored table, or --in-place to overwrite SOURCE")
+        raise typer.Exit(code=1)
+    _check_formats(source, output)
+    df = read_table(source)
+    if column not in df.columns:
+        typer.echo(f"❌ Column {column!r} not found in {source}")
+        raise typer.Exit(code=1)
+
+    rescored = rescore_table(df, column=column, only_non_academic=only_non_academic)
+    target = output or source
+    write_table(rescored, target)
+    typer.echo(f"✅ Rescored {len(df)} rows, {int(rescored['is_non_academic'].sum())} non-academic, saved to {target}")
+
+@app.command()
+def ingest(
+    paths: List[str] = typer.Argument(..., help="PubMed baseline/update XML files (.xml or .xml.gz)"),
+    file: str = typer.Option(None, "--file", "-f", help="Output file name; .csv, .jsonl or .parquet picks the format"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Parse this many files at once in worker processes (0 parses in-process)"),
+    organizations_path: str = typer.Option(DEFAULT_ORGANIZATIONS_PATH, "--organizations-path", help="SQLite table of affiliation strings resolved to company names"),
+    no_organizations: bool = typer.Option(False, "--no-organizations", help="Leave the Company Name(s) column empty instead of resolving it")
+):
+
+    """Filter local PubMed XML dumps for non-academic authors, without touching the network."""
+
+    _check_formats(file)
+    sink = open_sink(file) if file else MemorySink()
+    organizations = None if no_organizations else OrganizationResolver(organizations_path)
+
+    with sink:
+        for path, papers in iter_dump_files(paths, workers=workers, organizations=organizations):
+            sink.write(papers)
+            typer.echo(f"📦 {path.name}: {len(papers)} papers with non-academic authors")
+
+    if organizations is not None:
+        typer.echo(f"🏢 Company names: {organizations.hits} known, {organizations.misses} newly resolved")
+        organizations.close()
+
+    if not sink.count:
+        typer.echo("❌ No relevant papers found with non-academic authors.")
+        return
+
     if file:
-        save_to_csv(papers, file)
-        typer.echo(f"✅ Results saved to {file}")
+        typer.echo(f"✅ {sink.count} results saved to {file}")
     else:
         typer.echo("📄 Retrieved Papers:")
+        for paper in sink.records:
+            typer.echo(paper.to_row())
+
+@app.command()
+def query(
+    text: str = typer.Option(None, "--text", "-t", help="Only papers whose title contains this text"),
+    year: int = typer.Option(None, "--year", "-y", help="Only papers published in this year"),
+    affiliation: str = typer.Option(None, "--affiliation", "-a", help="Only papers with an author affiliation containing this text"),
+    all_papers: bool = typer.Option(False, "--all-papers", help="Include papers without company authors"),
+    limit: int = typer.Option(None, "--limit", "-n", help="Maximum number of papers to return"),
+    file: str = typer.Option(None, "--file", "-f", help="Output file name; .csv, .jsonl or .parquet picks the format"),
+    index_path: str = typer.Option(DEFAULT_INDEX_PATH, "--index-path", help="SQLite index built up by earlier searches")
+):
+
+    """Answer a question from the local index of earlier searches, without touching the network."""
+
+    _check_formats(file)
+    with ArticleIndex(index_path) as index:
+        papers = index.search(text=text, year=year, affiliation=affiliation, company_only=not all_papers, limit=limit)
+
+    if not papers:
+        typer.echo("❌ No matching papers in the local index.")
+        return
+
+    if file:
+        with open_sink(file) as sink:
+            sink.write(papers)
+        typer.echo(f"✅ {len(papers)} results saved to {file}")
+    else:
+        typer.echo("📄 Indexed Papers:")
         for paper in papers:
-            typer.echo(paper)
+            typer.echo(paper.to_row())
+
+@app.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(8080, "--port", "-p", help="Port to listen on"),
+    lru_size: int = typer.Option(DEFAULT_LRU_SIZE, "--lru-size", help="Parsed articles kept in memory between requests"),
+    batch_size: int = typer.Option(EFETCH_BATCH_SIZE, "--batch-size", "-b", help="PubMed IDs per EFetch request"),
+    cache_dir: str = typer.Option(DEFAULT_CACHE_DIR, "--cache-dir", help="Directory of the on-disk EFetch cache"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Always fetch from PubMed and leave the cache untouched"),
+    index_path: str = typer.Option(DEFAULT_INDEX_PATH, "--index-path", help="SQLite index that every parsed article is added to"),
+    no_index: bool = typer.Option(False, "--no-index", help="Do not add parsed articles to the local index"),
+    organizations_path: str = typer.Option(DEFAULT_ORGANIZATIONS_PATH, "--organizations-path", help="SQLite table of affiliation strings resolved to company names"),
+    no_organizations: bool = typer.Option(False, "--no-organizations", help="Leave the Company Name(s) column empty instead of resolving it"),
+    api_key: str = typer.Option(None, "--api-key", help="NCBI API key (default: $NCBI_API_KEY or the config file); raises the rate limit to 10 req/s"),
+    email: str = typer.Option(None, "--email", help="Contact email sent to NCBI (default: $NCBI_EMAIL or the config file)"),
+    tool: str = typer.Option(None, "--tool", help="Tool name sent to NCBI (default: $NCBI_TOOL, the config file or pubmed_fetcher)"),
+    config: str = typer.Option(DEFAULT_CONFIG_PATH, "--config", help="INI file whose [ncbi] section holds api_key, email and tool")
+):
+
+    """Serve searches and paper lookups over HTTP, keeping connections and parsed articles warm."""
+
+    cache = None if no_cache else ArticleCache(cache_dir)
+    index = None if no_index else ArticleIndex(index_path)
+    organizations = None if no_organizations else OrganizationResolver(organizations_path)
+    credentials = load_credentials(api_key=api_key, email=email, tool=tool, config_path=config)
+
+    with EutilsClient(credentials=credentials) as client:
+        service = PaperService(client=client, cache=cache, index=index, organizations=organizations, lru_size=lru_size, batch_size=batch_size, host=host, port=port)
+        typer.echo(f"🔑 NCBI rate tier: {client.tier}")
+        typer.echo(f"🌐 Serving on {service.url}: GET /ids, GET /search, POST /papers, GET /stats")
+        try:
+            service.serve_forever()
+        except KeyboardInterrupt:
+            service.stop()
+            typer.echo(f"📊 {service.summary()}")
+
+    if cache is not None:
+        cache.close()
+
+    if index is not None:
+        index.close()
+
+    if organizations is not None:
+        organizations.close()
+
+@app.command("mock-eutils")
+def mock_eutils(
+    fixtures_dir: str = typer.Option(".", "--fixtures", help="Directory holding debug_<pmid>.xml EFetch fixtures"),
+    port: int = typer.Option(8000, "--port", "-p", help="Port to listen on"),
+    latency: float = typer.Option(0.0, "--latency", help="Seconds every response is delayed by"),
+    jitter: float = typer.Option(0.0, "--jitter", help="Up to this many extra random seconds of delay"),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Fraction of requests answered with 503"),
+    throttle_rate: float = typer.Option(0.0, "--throttle-rate", help="Fraction of requests answered with 429"),
+    payload_size: int = typer.Option(0, "--payload-size", help="Bytes of abstract padding per synthetic article"),
+    result_count: int = typer.Option(None, "--results", help="PMIDs esearch reports (default: one per fixture)")
+):
+
+    """Serve a local stand-in for the E-utilities, for load and latency testing."""
+
+    server = MockEutilsServer(
+        fixtures_dir, port=port, latency=latency, jitter=jitter, error_rate=error_rate,
+        throttle_rate=throttle_rate, payload_size=payload_size, result_count=result_count
+    )
+    typer.echo(f"🧪 Mock E-utilities on {server.url} with {len(server.fixtures)} fixtures")
+    typer.echo(f"   export PUBMED_EUTILS_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+        typer.echo(f"📊 {server.stats}")
 
 
 def main():
@@ -0,0 +1,182 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Optional, TypeVar, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from pubmed_fetcher.credentials import NcbiCredentials, load_credentials
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.ratelimit import TokenBucket
+
+
+# NCBI E-utilities request ceilings (requests/second) without and with an API key.
+NCBI_RATE_LIMIT = 3.0
+NCBI_KEYED_RATE_LIMIT = 10.0
+
+# Pick the ceiling from the credentials: keyed tier with an API key, anonymous otherwise.
+AUTO_RATE_LIMIT = "auto"
+
+# Responses worth retrying: throttling and transient server-side failures.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Failures while a streamed body is read, after request() has returned:
+# requests raises the first two from iter_content, urllib3 the rest from raw reads.
+BODY_ERRORS = (requests.ConnectionError, requests.exceptions.ChunkedEncodingError, ProtocolError, ReadTimeoutError)
+
+T = TypeVar("T")
+
+
+class EutilsClient:
+    """Shared HTTP client for the NCBI E-utilities.
+
+    Owns one pooled, keep-alive ``requests.Session`` for the whole run, paces
+    every request (including retries) through a token bucket, and retries
+    throttled or failed requests with exponential backoff and jitter,
+    honouring ``Retry-After`` when the server sends it; :meth:`post_stream`
+    also retries a connection that drops while the body is being read.
+    ``retry_count`` is safe to read from any thread. ``credentials`` are
+    added to every request; with the default ``rate_limit`` an API key
+    lifts the bucket to NCBI's keyed tier. ``rate_limit=None`` disables
+    pacing altogether.
+    """
+
+    def __init__(
+        self,
+        rate_limit: Union[float, str, None] = AUTO_RATE_LIMIT,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 30.0,
+        pool_size: int = 10,
+        credentials: Optional[NcbiCredentials] = None
+    ):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate", "Connection": "keep-alive"})
+
+        self.credentials = credentials or NcbiCredentials()
+        if rate_limit == AUTO_RATE_LIMIT:
+            rate_limit = NCBI_KEYED_RATE_LIMIT if self.credentials.keyed else NCBI_RATE_LIMIT
+        self.rate_limit = rate_limit
+        self.limiter = TokenBucket(rate_limit) if rate_limit else None
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.retry_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def tier(self) -> str:
+        """Human-readable rate tier, e.g. ``"keyed (10 req/s)"``."""
+        name = "keyed" if self.credentials.keyed else "anonymous"
+        pace = f"{self.rate_limit:g} req/s" if self.rate_limit else "unthrottled"
+        return f"{name} ({pace})"
+
+    def get(self, url: str, params: Optional[dict] = None, **kwargs) -> requests.Response:
+        return self.request("GET", url, params={**self.credentials.params(), **(params or {})}, **kwargs)
+
+    def post(self, url: str, data: Optional[dict] = None, **kwargs) -> requests.Response:
+        return self.request("POST", url, data={**self.credentials.params(), **(data or {})}, **kwargs)
+
+    def post_stream(self, url: str, consume: Callable[[requests.Response], T], data: Optional[dict] = None, **kwargs) -> T:
+        """POST with a streamed response and return ``consume(response)``.
+
+        :meth:`request` only retries up to the response headers. A connection
+        that drops while ``consume`` reads the body is retried here with the
+        same backoff, by sending the request again and calling ``consume``
+        afresh, so ``consume`` must not carry state over from a failed attempt.
+        """
+        for attempt in range(self.max_retries + 1):
+            with self.post(url, data=data, stream=True, **kwargs) as response:
+                try:
+                    return consume(response)
+                except BODY_ERRORS as e:
+                    if attempt == self.max_retries:
+                        raise
+                    reason = f"{type(e).__name__} reading the body"
+            self._retry(reason, url, self._backoff_delay(attempt), attempt)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request, retrying transient failures; raises once retries are exhausted."""
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._retry_after(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                reason = f"HTTP {response.status_code}"
+                response.close()
+
+            self._retry(reason, url, delay, attempt)
+
+    def _retry(self, reason: str, url: str, delay: float, attempt: int):
+        """Count, report and wait out one retry."""
+        with self._lock:
+            self.retry_count += 1
+        METRICS.increment("retries")
+        print(f"🔁 {reason} from {url}, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+        time.sleep(delay)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter: a random delay in [cap/2, cap]."""
+        cap = min(self.max_backoff, self.backoff * 2 ** attempt)
+        return cap / 2 + random.uniform(0, cap / 2)
+
+    def _retry_after(self, response: requests.Response) -> Optional[float]:
+        """Parse a ``Retry-After`` header given either in seconds or as an HTTP date."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                return None
+        return min(self.max_backoff, max(0.0, delay))
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self) -> "EutilsClient":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+_default_client: Optional[EutilsClient] = None
+
+def get_default_client() -> EutilsClient:
+    """Return the process-wide client used when callers do not pass one.
+
+    Its credentials come from the ``NCBI_*`` environment variables or the
+    config file, see :func:`load_credentials`.
+    """
+    global _default_client
+    if _default_client is None:
+        _default_client = EutilsClient(credentials=load_credentials())
+    return _default_client
@@ -0,0 +1,57 @@
+import configparser
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+DEFAULT_CONFIG_PATH = "~/.config/pubmed_fetcher/config.ini"
+DEFAULT_TOOL = "pubmed_fetcher"
+
+# Environment variables read by load_credentials, by field.
+ENV_VARS = {"api_key": "NCBI_API_KEY", "email": "NCBI_EMAIL", "tool": "NCBI_TOOL"}
+
+
+@dataclass(frozen=True)
+class NcbiCredentials:
+    """The ``api_key``, ``tool`` and ``email`` NCBI asks E-utilities callers to send."""
+
+    api_key: Optional[str] = None
+    email: Optional[str] = None
+    tool: Optional[str] = DEFAULT_TOOL
+
+    @property
+    def keyed(self) -> bool:
+        return bool(self.api_key)
+
+    def params(self) -> Dict[str, str]:
+        """The non-empty fields, as E-utilities request parameters."""
+        fields = {"api_key": self.api_key, "email": self.email, "tool": self.tool}
+        return {name: value for name, value in fields.items() if value}
+
+
+def load_credentials(
+    api_key: Optional[str] = None,
+    email: Optional[str] = None,
+    tool: Optional[str] = None,
+    config_path: Union[str, Path] = DEFAULT_CONFIG_PATH
+) -> NcbiCredentials:
+    """Resolve credentials from arguments, then ``NCBI_*`` env vars, then the config file.
+
+    The config file is INI with an ``[ncbi]`` section holding any of
+    ``api_key``, ``email`` and ``tool``; it is optional.
+    """
+    config = configparser.ConfigParser()
+    config.read(Path(config_path).expanduser(), encoding="utf-8")
+    section = config["ncbi"] if config.has_section("ncbi") else {}
+
+    given = {"api_key": api_key, "email": email, "tool": tool}
+    resolved = {
+        name: value or os.environ.get(ENV_VARS[name]) or section.get(name)
+        for name, value in given.items()
+    }
+    return NcbiCredentials(
+        api_key=resolved["api_key"],
+        email=resolved["email"],
+        tool=resolved["tool"] or DEFAULT_TOOL
+    )
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import date
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Set, Tuple, Union
+
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.pubmed_fetcher import ESEARCH_DATE_FORMAT, ESEARCH_MAX_RESULTS, iter_pubmed_ids
+from pubmed_fetcher.records import COLUMNS, PaperRecord
+from pubmed_fetcher.rescore import read_table
+from pubmed_fetcher.sinks import SINKS_BY_SUFFIX, CsvSink
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+DEFAULT_CHECKPOINT_DIR = "~/.cache/pubmed_fetcher/checkpoints"
+
+# Modification date: covers articles first indexed after the last run as
+# well as older ones that have been revised since.
+INCREMENTAL_DATETYPE = "mdat"
+
+
+class QueryCheckpoint:
+    """Per-query record of the last successful run and every PMID seen so far.
+
+    Stored as JSON under ``directory`` in a file named after a hash of the
+    query, and replaced atomically on :meth:`save`.
+    """
+
+    def __init__(self, directory: Union[str, Path], query: str):
+        self.query = query
+        digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:16]
+        self.path = Path(directory).expanduser() / f"{digest}.json"
+        self.last_run: Optional[str] = None
+        self.seen: Set[str] = set()
+
+        if self.path.exists():
+            state = json.loads(self.path.read_text(encoding="utf-8"))
+            self.last_run = state.get("last_run")
+            self.seen = set(state.get("seen", []))
+
+    def save(self, run_date: str, pmids: List[str]):
+        """Record a completed run on ``run_date`` that returned ``pmids``."""
+        self.last_run = run_date
+        self.seen.update(pmids)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps({"query": self.query, "last_run": self.last_run, "seen": sorted(self.seen)}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def fetch_incremental_ids(
+    query: str,
+    checkpoint: QueryCheckpoint,
+    client: Optional[EutilsClient] = None
+) -> Tuple[List[str], str, bool]:
+    """Return the PMIDs added or revised since the checkpoint's last run, today's run date, and whether that is all of them.
+
+    The first run for a query has no lower bound and walks the whole result
+    set. ``mindate`` is inclusive, so the day of the last run is searched
+    again; the overlap is small and nothing modified late that day is
+    missed. The checkpoint is not updated here: call
+    :meth:`QueryCheckpoint.save` once the results are safely stored, and
+    only if the search was complete. esearch stops at
+    ``ESEARCH_MAX_RESULTS``, so a search that reaches it counts as
+    truncated; saving then would skip the hits it never returned.
+    """
+    run_date = date.today().strftime(ESEARCH_DATE_FORMAT)
+    pmids = list(iter_pubmed_ids(
+        query,
+        max_results=None,
+        client=client,
+        mindate=checkpoint.last_run,
+        maxdate=run_date,
+        datetype=INCREMENTAL_DATETYPE
+    ))
+
+    revised = sum(pmid in checkpoint.seen for pmid in pmids)
+    print(f"🆕 {len(pmids) - revised} new and {revised} revised PubMed IDs since {checkpoint.last_run or 'the beginning'}")
+    return pmids, run_date, len(pmids) < ESEARCH_MAX_RESULTS
+
+
+def merge_results(filename: Union[str, Path], papers: List[PaperRecord], refreshed: List[str]) -> pd.DataFrame:
+    """Merge freshly fetched ``papers`` into the rows already saved in ``filename``.
+
+    Saved rows for every PMID in ``refreshed`` are dropped first, so a
+    revised article replaces its old row, or loses it if it no longer has
+    non-academic authors.
+    """
+    import pandas as pd
+
+    affiliation_list = SINKS_BY_SUFFIX.get(Path(filename).suffix.lower(), CsvSink).affiliation_list
+    new = pd.DataFrame([paper.to_row(affiliation_list) for paper in papers], columns=COLUMNS)
+    if not Path(filename).exists():
+        return new
+
+    existing = read_table(filename)
+    existing["PubmedID"] = existing["PubmedID"].astype(str)
+    kept = existing[~existing["PubmedID"].isin(set(refreshed))]
+    return pd.concat([kept, new], ignore_index=True)
@@ -0,0 +1,160 @@
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Iterable, List, Optional, Union
+
+from pubmed_fetcher.records import AuthorRecord, PaperRecord
+
+
+DEFAULT_INDEX_PATH = "~/.cache/pubmed_fetcher/index.sqlite3"
+
+# Author columns added after the first release; older indexes gain them on open.
+AUTHOR_DETAIL_COLUMNS = {
+    "fore_name": "TEXT NOT NULL DEFAULT ''",
+    "initials": "TEXT NOT NULL DEFAULT ''",
+    "affiliations": "TEXT NOT NULL DEFAULT '[]'",
+    "emails": "TEXT NOT NULL DEFAULT '[]'",
+    "orcid": "TEXT NOT NULL DEFAULT ''",
+    "organization": "TEXT NOT NULL DEFAULT ''"
+}
+
+
+class ArticleIndex:
+    """Local SQLite index of every parsed article, academic or not.
+
+    Stores each article's PMID, title, publication year, email and company
+    flag, plus its authors and affiliations, so that repeat questions can
+    be answered by :meth:`search` without esearch or EFetch. Re-adding a
+    PMID replaces the old entry. Safe to share between the threads of one
+    process.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_INDEX_PATH):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            " pmid TEXT PRIMARY KEY,"
+            " title TEXT NOT NULL,"
+            " pub_date TEXT NOT NULL,"
+            " year INTEGER,"
+            " email TEXT NOT NULL,"
+            " is_company INTEGER NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS authors ("
+            " pmid TEXT NOT NULL,"
+            " position INTEGER NOT NULL,"
+            " name TEXT NOT NULL,"
+            " affiliation TEXT NOT NULL,"
+            " is_company INTEGER NOT NULL,"
+            " PRIMARY KEY (pmid, position));"
+            "CREATE INDEX IF NOT EXISTS articles_company_year ON articles (is_company, year);"
+        )
+        existing = {row[1] for row in self._db.execute("PRAGMA table_info(authors)")}
+        for column, declaration in AUTHOR_DETAIL_COLUMNS.items():
+            if column not in existing:
+                self._db.execute(f"ALTER TABLE authors ADD COLUMN {column} {declaration}")
+        self._db.commit()
+
+    def add_many(self, papers: Iterable[PaperRecord]):
+        """Insert or replace the given articles and their authors."""
+        papers = list(papers)
+        if not papers:
+            return
+
+        articles = [
+            (p.pmid, p.title, p.pub_date, int(p.pub_date) if p.pub_date.isdigit() else None, p.corresponding_email, p.is_company)
+            for p in papers
+        ]
+        authors = [
+            (p.pmid, position, a.name, a.affiliation, a.is_company, a.fore_name, a.initials,
+             json.dumps(a.affiliations, ensure_ascii=False), json.dumps(a.emails), a.orcid, a.organization)
+            for p in papers for position, a in enumerate(p.authors)
+        ]
+
+        with self._lock:
+            self._db.executemany("DELETE FROM authors WHERE pmid = ?", ((p.pmid,) for p in papers))
+            self._db.executemany("INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)", articles)
+            self._db.executemany(
+                "INSERT INTO authors (pmid, position, name, affiliation, is_company, fore_name, initials, affiliations, emails, orcid, organization)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                authors
+            )
+            self._db.commit()
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        year: Optional[int] = None,
+        affiliation: Optional[str] = None,
+        company_only: bool = True,
+        limit: Optional[int] = None
+    ) -> List[PaperRecord]:
+        """Return indexed articles matching every given filter, newest first.
+
+        ``text`` and ``affiliation`` are case-insensitive substring matches
+        on the title and on any author's affiliation respectively.
+        """
+        clauses, params = [], []
+        if company_only:
+            clauses.append("is_company = 1")
+        if year is not None:
+            clauses.append("year = ?")
+            params.append(year)
+        if text:
+            clauses.append("title LIKE ? ESCAPE '\\'")
+            params.append(_like(text))
+        if affiliation:
+            clauses.append("pmid IN (SELECT pmid FROM authors WHERE affiliation LIKE ? ESCAPE '\\' OR affiliations LIKE ? ESCAPE '\\')")
+            params += [_like(affiliation)] * 2
+
+        sql = "SELECT pmid, title, pub_date, email FROM articles"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY year DESC, pmid DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+            papers = []
+            for pmid, title, pub_date, email in rows:
+                authors = tuple(
+                    AuthorRecord(
+                        name, affiliation, bool(is_company), fore_name, initials,
+                        tuple(json.loads(affiliations)), tuple(json.loads(emails)), orcid, organization
+                    )
+                    for name, affiliation, is_company, fore_name, initials, affiliations, emails, orcid, organization in self._db.execute(
+                        "SELECT name, affiliation, is_company, fore_name, initials, affiliations, emails, orcid, organization"
+                        " FROM authors WHERE pmid = ? ORDER BY position",
+                        (pmid,)
+                    )
+                )
+                papers.append(PaperRecord(pmid, title, pub_date, authors, email))
+
+        return papers
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ArticleIndex":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _like(text: str) -> str:
+    """A LIKE pattern matching ``text`` anywhere, with wildcards in it escaped."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
@@ -0,0 +1,56 @@
+import gzip
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.organizations import OrganizationResolver
+from pubmed_fetcher.parser import parse_articles
+from pubmed_fetcher.pubmed_fetcher import _ParsedBatch, _from_worker, _process_pool
+from pubmed_fetcher.records import PaperRecord
+
+
+def parse_dump_file(path: Union[str, Path]) -> List[PaperRecord]:
+    """Parse one PubMed baseline or update file, gzipped or not.
+
+    The file is decompressed and parsed as a stream, so memory stays flat
+    however large it is; only the records with non-academic authors are
+    kept.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        return list(parse_articles(f))
+
+
+def iter_dump_files(
+    paths: Iterable[Union[str, Path]],
+    workers: int = 0,
+    organizations: Optional[OrganizationResolver] = None
+) -> Iterator[Tuple[Path, List[PaperRecord]]]:
+    """Yield ``(path, records)`` for each dump file, in the order given.
+
+    With ``workers > 0`` the files are parsed in that many processes at
+    once; otherwise one after another in this process. ``organizations``
+    fills in each company author's canonical company name.
+    """
+    paths = [Path(path) for path in paths]
+    for path, papers in zip(paths, _parse_dump_files(paths, workers)):
+        yield path, organizations.annotate(papers) if organizations is not None else papers
+
+
+def _parse_dump_files(paths: List[Path], workers: int) -> Iterator[List[PaperRecord]]:
+    if not workers:
+        for path in paths:
+            yield parse_dump_file(path)
+        return
+
+    with _process_pool(workers) as pool:
+        for result in pool.map(_parse_dump_worker, paths):
+            yield list(_from_worker(result).records.values())
+
+
+def _parse_dump_worker(path: Path):
+    """Process-pool entry point: :func:`parse_dump_file` and this worker's metrics, for :func:`_from_worker`."""
+    METRICS.reset()
+    papers = parse_dump_file(path)
+    return _ParsedBatch(records={paper.pmid: paper for paper in papers}, fetched={}), METRICS.snapshot()
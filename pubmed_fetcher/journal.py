@@ -0,0 +1,69 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Set, Union
+
+from pubmed_fetcher.records import PaperRecord
+
+
+class ProgressJournal:
+    """Append-only, write-ahead log of completed EFetch batches.
+
+    Each line records the PMIDs of one finished batch and the records
+    extracted from it, and is flushed and fsynced before the batch counts as
+    done. Reopening the journal with ``resume=True`` replays it, so a crawl
+    that died part-way can skip the PMIDs in ``done`` and still return the
+    records in ``papers``. A torn last line from a crash mid-write is
+    ignored. Safe to share between threads.
+    """
+
+    def __init__(self, path: Union[str, Path], resume: bool = False):
+        self.path = Path(path)
+        self.done: Set[str] = set()
+        self.papers: List[PaperRecord] = []
+        self._lock = threading.Lock()
+
+        if resume and self.path.exists():
+            self._replay()
+        self._file = open(self.path, "a" if resume else "w", encoding="utf-8")
+
+    def _replay(self):
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self.done.update(entry["pmids"])
+                self.papers.extend(PaperRecord.from_dict(paper) for paper in entry["papers"])
+                valid_bytes += len(line)
+
+        # Drop a torn tail so new entries start on a clean line.
+        with open(self.path, "r+b") as f:
+            f.truncate(valid_bytes)
+
+    def record(self, pmids: List[str], papers: List[PaperRecord]):
+        """Durably log a finished batch."""
+        line = json.dumps({"pmids": pmids, "papers": [paper.to_dict() for paper in papers]}, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.done.update(pmids)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    def discard(self):
+        """Close and delete the journal once its results are safely saved."""
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+    def __enter__(self) -> "ProgressJournal":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,119 @@
+import json
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, Union
+
+
+class Metrics:
+    """Thread-safe per-stage timings and counters for one run.
+
+    Stages accumulate wall-clock seconds and call counts (``esearch``,
+    ``efetch``, ``parse``, ``classify``, ``write``); counters track totals
+    such as ``bytes_received``, ``retries`` and ``cache_hits``. Parse
+    workers in other processes send a :meth:`snapshot` back to be
+    :meth:`merge`-d into the parent's registry.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.seconds: Dict[str, float] = defaultdict(float)
+            self.calls: Dict[str, int] = defaultdict(int)
+            self.counters: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def observe(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            self.seconds[stage] += seconds
+            self.calls[stage] += calls
+
+    def increment(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] += amount
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {"seconds": dict(self.seconds), "calls": dict(self.calls), "counters": dict(self.counters)}
+
+    def merge(self, snapshot: Dict[str, Dict]):
+        with self._lock:
+            for stage, seconds in snapshot["seconds"].items():
+                self.seconds[stage] += seconds
+            for stage, calls in snapshot["calls"].items():
+                self.calls[stage] += calls
+            for counter, amount in snapshot["counters"].items():
+                self.counters[counter] += amount
+
+    def summary(self) -> Dict:
+        """Snapshot plus derived figures such as the cache hit rate."""
+        summary = self.snapshot()
+        lookups = summary["counters"].get("cache_hits", 0) + summary["counters"].get("cache_misses", 0)
+        if lookups:
+            summary["cache_hit_rate"] = summary["counters"].get("cache_hits", 0) / lookups
+        return summary
+
+    def to_json(self) -> str:
+        return json.dumps(self.summary(), indent=2, sort_keys=True)
+
+    def to_prometheus(self, prefix: str = "pubmed_fetcher") -> str:
+        """Render in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Wall-clock seconds spent in each pipeline stage.",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{stage}"}} {seconds:.6f}' for stage, seconds in sorted(snapshot["seconds"].items())]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Times each pipeline stage ran.",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{stage}"}} {calls}' for stage, calls in sorted(snapshot["calls"].items())]
+        for counter, amount in sorted(snapshot["counters"].items()):
+            lines += [f"# TYPE {prefix}_{counter}_total counter", f"{prefix}_{counter}_total {amount}"]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Union[str, Path]):
+        """Write Prometheus text for ``.prom``/``.txt`` files, JSON otherwise."""
+        path = Path(path)
+        text = self.to_prometheus() if path.suffix.lower() in (".prom", ".txt") else self.to_json()
+        path.write_text(text, encoding="utf-8")
+
+
+class TimedReader:
+    """Wrap a binary stream, charging reads to a stage and counting the bytes.
+
+    ``seconds`` holds the time spent inside :meth:`read`, so callers can
+    separate network waits from the work done on what was read.
+    """
+
+    def __init__(self, raw: BinaryIO, metrics: "Metrics", stage: str = "efetch"):
+        self.raw = raw
+        self.metrics = metrics
+        self.stage = stage
+        self.seconds = 0.0
+
+    def read(self, size: int = -1) -> bytes:
+        start = time.perf_counter()
+        data = self.raw.read(size)
+        elapsed = time.perf_counter() - start
+        self.seconds += elapsed
+        self.metrics.observe(self.stage, elapsed, calls=0)
+        self.metrics.increment("bytes_received", len(data))
+        return data
+
+
+# Process-wide registry that the fetch pipeline records into.
+METRICS = Metrics()
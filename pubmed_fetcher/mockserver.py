@@ -0,0 +1,216 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
+
+
+PUBMED_ARTICLE = (
+    "<PubmedArticle><MedlineCitation Status=\"MEDLINE\" Owner=\"NLM\"><PMID Version=\"1\">{pmid}</PMID>"
+    "<Article PubModel=\"Print\"><Journal><JournalIssue CitedMedium=\"Internet\"><PubDate><Year>2024</Year></PubDate>"
+    "</JournalIssue></Journal><ArticleTitle>{title}</ArticleTitle>{abstract}"
+    "<AuthorList CompleteYN=\"Y\">{authors}</AuthorList></Article></MedlineCitation></PubmedArticle>"
+)
+AUTHOR = (
+    "<Author ValidYN=\"Y\"><LastName>{last_name}</LastName><ForeName>{fore_name}</ForeName><Initials>{initials}</Initials>"
+    "<AffiliationInfo><Affiliation>{affiliation}</Affiliation></AffiliationInfo>{email}</Author>"
+)
+
+
+def author_element(last_name: str, affiliation: str, fore_name: str = "A", email: Optional[str] = None) -> str:
+    """Build an ``<Author>`` element with one affiliation and an optional e-mail."""
+    return AUTHOR.format(
+        last_name=last_name,
+        fore_name=fore_name,
+        initials=fore_name[:1],
+        affiliation=affiliation,
+        email=f"<ElectronicAddress>{email}</ElectronicAddress>" if email else ""
+    )
+
+
+def pubmed_article(pmid: Union[int, str], authors: Iterable[str], title: Optional[str] = None, abstract: str = "") -> str:
+    """Build a synthetic ``<PubmedArticle>`` from :func:`author_element` strings."""
+    return PUBMED_ARTICLE.format(
+        pmid=pmid,
+        title=title or f"Synthetic article {pmid}.",
+        abstract=f"<Abstract><AbstractText>{abstract}</AbstractText></Abstract>" if abstract else "",
+        authors="".join(authors)
+    )
+
+
+def article_set(*articles: str) -> str:
+    """Wrap ``<PubmedArticle>`` strings in an EFetch ``PubmedArticleSet`` document."""
+    return "<?xml version=\"1.0\" ?>\n<PubmedArticleSet>\n" + "\n".join(articles) + "\n</PubmedArticleSet>\n"
+
+
+def article_element(text: str) -> str:
+    """Return the ``<PubmedArticle>`` element of a recorded EFetch payload."""
+    return re.search(r"<PubmedArticle>.*</PubmedArticle>", text, re.S).group(0)
+
+
+def recorded_articles(fixtures_dir: Union[str, Path]) -> Dict[str, str]:
+    """PMID -> ``<PubmedArticle>`` XML from the ``debug_<pmid>.xml`` payloads in ``fixtures_dir``."""
+    return {
+        path.stem.split("_", 1)[1]: article_element(path.read_text(encoding="utf-8"))
+        for path in sorted(Path(fixtures_dir).glob("debug_*.xml"))
+    }
+
+
+class MockEutilsServer:
+    """Local stand-in for the NCBI E-utilities, for load and latency testing.
+
+    Serves ``esearch.fcgi`` JSON and ``efetch.fcgi`` XML. EFetch answers
+    from the ``debug_<pmid>.xml`` fixtures in ``fixtures_dir`` and makes up
+    a synthetic article, padded to ``payload_size`` bytes of abstract, for
+    any other PMID. ESearch lists the fixture PMIDs followed by synthetic
+    ones up to ``result_count``.
+
+    Every request waits ``latency`` seconds plus up to ``jitter`` more.
+    Then a ``throttle_rate`` fraction get a 429 with ``Retry-After`` and an
+    ``error_rate`` fraction get a 503. ``stats`` counts what was served.
+    Point the fetcher at :attr:`url` through ``PUBMED_EUTILS_URL``.
+    """
+
+    def __init__(
+        self,
+        fixtures_dir: Union[str, Path] = ".",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 1.0,
+        payload_size: int = 0,
+        result_count: Optional[int] = None,
+        seed: Optional[int] = None
+    ):
+        self.fixtures = recorded_articles(fixtures_dir)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.payload_size = payload_size
+        self.result_count = len(self.fixtures) if result_count is None else result_count
+        self.stats = {"esearch": 0, "efetch": 0, "throttled": 0, "errors": 0, "articles": 0, "bytes": 0}
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockEutilsServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "MockEutilsServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def id_list(self) -> List[str]:
+        ids = list(self.fixtures)[:self.result_count]
+        ids += [str(90000000 + i) for i in range(self.result_count - len(ids))]
+        return ids
+
+    def article(self, pmid: str) -> str:
+        return self.fixtures.get(pmid) or pubmed_article(pmid, [
+            author_element("Smith", "Genentech Inc., South San Francisco, CA, USA."),
+            author_element("Doe", "Stanford University, Stanford, CA, USA.")
+        ], abstract="x" * self.payload_size)
+
+    def _roll(self, rate: float) -> bool:
+        with self._lock:
+            return self._random.random() < rate
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+
+def _handler(server: MockEutilsServer):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self._serve(parse_qs(urlparse(self.path).query))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            params = parse_qs(urlparse(self.path).query)
+            params.update(parse_qs(self.rfile.read(length).decode("utf-8")))
+            self._serve(params)
+
+        def _serve(self, params: Dict[str, List[str]]):
+            endpoint = urlparse(self.path).path.rsplit("/", 1)[-1]
+            if endpoint not in ("esearch.fcgi", "efetch.fcgi"):
+                self._send(404, b"unknown endpoint", "text/plain")
+                return
+
+            delay = server.latency + (server._random.uniform(0, server.jitter) if server.jitter else 0.0)
+            if delay:
+                time.sleep(delay)
+
+            if server._roll(server.throttle_rate):
+                server._count("throttled")
+                self._send(429, b'{"error":"API rate limit exceeded"}', "application/json", {"Retry-After": str(server.retry_after)})
+                return
+            if server._roll(server.error_rate):
+                server._count("errors")
+                self._send(503, b"Service Unavailable", "text/plain")
+                return
+
+            if endpoint == "esearch.fcgi":
+                server._count("esearch")
+                self._send(200, json.dumps(_esearch(server, params)).encode("utf-8"), "application/json")
+            else:
+                server._count("efetch")
+                ids = [pmid for value in params.get("id", []) for pmid in value.split(",") if pmid]
+                server._count("articles", len(ids))
+                body = article_set(*map(server.article, ids))
+                self._send(200, body.encode("utf-8"), "text/xml")
+
+        def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+            server._count("bytes", len(body))
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def _esearch(server: MockEutilsServer, params: Dict[str, List[str]]) -> Dict:
+    ids = server.id_list()
+    retstart = int(params.get("retstart", ["0"])[0])
+    retmax = int(params.get("retmax", ["20"])[0])
+    return {"esearchresult": {
+        "count": str(len(ids)),
+        "retstart": str(retstart),
+        "retmax": str(retmax),
+        "idlist": ids[retstart:retstart + retmax]
+    }}
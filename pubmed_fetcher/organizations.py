@@ -0,0 +1,182 @@
+import re
+import sqlite3
+import sys
+import threading
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from pubmed_fetcher.classifier import COMPANY_PATTERN
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.parser import EMAIL_PATTERN
+from pubmed_fetcher.records import PaperRecord
+
+
+DEFAULT_ORGANIZATIONS_PATH = "~/.cache/pubmed_fetcher/organizations.sqlite3"
+
+# Legal forms dropped from the end of an organization name; the final dot of a
+# dotted form is optional, so "S.A." and "S.A" both match.
+LEGAL_SUFFIXES = [
+    "inc", "incorporated", "corp", "corporation", "co", "company", "ltd", "limited", "llc", "lp", "llp", "plc",
+    "gmbh", "ag", "kg", "kgaa", "s.a.", "sa", "s.a.s.", "sas", "n.v.", "nv", "b.v.", "bv", "k.k.", "kk",
+    "s.p.a.", "spa", "s.r.l.", "srl", "a/s", "as", "ab", "oy", "se", "pty", "pvt"
+]
+
+# Legal forms that, standing alone as an affiliation part (the "Inc." of
+# "Genentech, Inc."), name the part before them. Bare two-letter forms such
+# as "CO", "SA", "AG" or "AS" are left out: in an address they are as likely
+# a US or Australian state.
+STANDALONE_LEGAL_SUFFIXES = [
+    "inc", "incorporated", "corp", "corporation", "ltd", "limited", "llc", "llp", "plc",
+    "gmbh", "kgaa", "s.a.", "s.a.s.", "n.v.", "b.v.", "k.k.", "s.p.a.", "s.r.l.", "a/s", "pty", "pvt"
+]
+
+_STANDALONE_SUFFIXES = {suffix.rstrip(".") for suffix in STANDALONE_LEGAL_SUFFIXES}
+_SUFFIX_PATTERN = re.compile(
+    r"(?:[\s,&]+(?:" + "|".join(re.escape(suffix.rstrip(".")) for suffix in sorted(LEGAL_SUFFIXES, key=len, reverse=True)) + r")\.?)+\s*$",
+    re.IGNORECASE
+)
+_ELECTRONIC_ADDRESS = re.compile(r"electronic address:.*$", re.IGNORECASE)
+
+
+def organization_name(affiliation: str) -> str:
+    """Extract the company named in ``affiliation``, without its legal form.
+
+    The affiliation is split on commas and semicolons. The first part
+    ending in a legal form ("F. Hoffmann-La Roche Ltd") wins, else the
+    first containing a company keyword ("Roche Pharma Research"); a part
+    that is nothing but an unambiguous legal form (the "Inc." of
+    "Genentech, Inc.") names the part before it, while a bare "CO" or "SA"
+    is taken for a state. Returns "" when no part looks like a company.
+    """
+    text = EMAIL_PATTERN.sub("", _ELECTRONIC_ADDRESS.sub("", affiliation))
+    # Only whitespace is trimmed here: the final dot may belong to a legal form.
+    parts = [part.strip() for part in re.split(r"[,;]", text)]
+
+    named = [i for i, part in enumerate(parts) if _SUFFIX_PATTERN.search(" " + part) and _strip_legal_form(part)]
+    standalone = [i for i, part in enumerate(parts) if i > 0 and part.lower().rstrip(".") in _STANDALONE_SUFFIXES]
+    incorporated = sorted(named + standalone)
+    keyworded = [i for i, part in enumerate(parts) if COMPANY_PATTERN.search(part)]
+    if not (incorporated or keyworded):
+        return ""
+    position = (incorporated or keyworded)[0]
+
+    if position in standalone:
+        return _strip_legal_form(parts[position - 1])
+    return _strip_legal_form(parts[position])
+
+
+def _strip_legal_form(part: str) -> str:
+    name = _SUFFIX_PATTERN.sub("", " " + part).strip(" .")
+    # "Merck & Co." and "Eli Lilly and Company" lose the joiner along with the suffix.
+    name = re.sub(r"\s+(?:&|and)$", "", name, flags=re.IGNORECASE)
+    return re.sub(r"\s+", " ", name)
+
+
+def organization_key(name: str) -> str:
+    """Case- and punctuation-insensitive key that variants of one name share."""
+    return " ".join(re.sub(r"[^\w&]+", " ", name.casefold()).split())
+
+
+class OrganizationResolver:
+    """Persistent affiliation -> canonical company name table.
+
+    Each distinct affiliation string is resolved once, by
+    :func:`organization_name`, and the answer is kept in a SQLite file
+    (and in memory for the life of the resolver). Names that differ only
+    in case and punctuation share an :func:`organization_key` and resolve
+    to whichever spelling was seen first, so "Pfizer Inc., Groton, CT" and
+    "PFIZER INC, New York" both come out as "Pfizer". ``hits`` and
+    ``misses`` count lookups. Safe to share between the threads of one
+    process.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_ORGANIZATIONS_PATH):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+
+        self._resolved: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(
+            "CREATE TABLE IF NOT EXISTS affiliations ("
+            " affiliation TEXT PRIMARY KEY,"
+            " organization TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS organizations ("
+            " key TEXT PRIMARY KEY,"
+            " name TEXT NOT NULL);"
+        )
+        self._db.commit()
+
+    def resolve_many(self, affiliations: Iterable[str]) -> Dict[str, str]:
+        """Return the canonical company name for each distinct affiliation ("" if none)."""
+        wanted = list(dict.fromkeys(affiliations))
+        with self._lock:
+            missing = [affiliation for affiliation in wanted if affiliation not in self._resolved]
+            self.hits += len(wanted) - len(missing)
+
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                self._resolved.update(self._db.execute(
+                    f"SELECT affiliation, organization FROM affiliations WHERE affiliation IN ({placeholders})", chunk
+                ))
+
+            new = [affiliation for affiliation in missing if affiliation not in self._resolved]
+            self.hits += len(missing) - len(new)
+            self.misses += len(new)
+            if new:
+                self._resolve_new(new)
+
+            return {affiliation: self._resolved[affiliation] for affiliation in wanted}
+
+    def _resolve_new(self, affiliations: List[str]):
+        names = {affiliation: organization_name(affiliation) for affiliation in affiliations}
+        keys = {organization_key(name) for name in names.values() if name}
+
+        canonical = {}
+        for key in keys:
+            row = self._db.execute("SELECT name FROM organizations WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                canonical[key] = row[0]
+
+        for affiliation, name in names.items():
+            if name:
+                name = canonical.setdefault(organization_key(name), name)
+            self._resolved[affiliation] = sys.intern(name)
+
+        self._db.executemany("INSERT OR IGNORE INTO organizations VALUES (?, ?)", canonical.items())
+        self._db.executemany("INSERT OR REPLACE INTO affiliations VALUES (?, ?)", ((a, self._resolved[a]) for a in affiliations))
+        self._db.commit()
+
+    def annotate(self, papers: Iterable[PaperRecord]) -> List[PaperRecord]:
+        """Return ``papers`` with ``organization`` filled in for every company author."""
+        papers = list(papers)
+        with METRICS.timer("organizations"):
+            names = self.resolve_many(
+                author.affiliation for paper in papers for author in paper.authors if author.is_company
+            )
+            return [
+                replace(paper, authors=tuple(
+                    replace(author, organization=names[author.affiliation]) if author.is_company else author
+                    for author in paper.authors
+                )) if paper.is_company else paper
+                for paper in papers
+            ]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM affiliations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "OrganizationResolver":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,120 @@
+import re
+import time
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from pubmed_fetcher.classifier import COMPANY_KEYWORDS, ACADEMIC_KEYWORDS, classify_affiliations
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.records import AuthorRecord, PaperRecord
+
+# Top-level children of a PubmedArticleSet; each is discarded once handled.
+_RECORD_TAGS = {"PubmedArticle", "PubmedBookArticle", "DeleteCitation"}
+
+# Addresses embedded in affiliation text, e.g. "... USA. Electronic address: jane@example.com."
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+
+# Bare ORCID iD inside an ``Identifier``, with or without the orcid.org URL.
+ORCID_PATTERN = re.compile(r"\d{4}-\d{4}-\d{4}-\d{3}[\dX]")
+
+
+def iter_articles(source: Union[str, BinaryIO]) -> Iterator[ET.Element]:
+    """Stream ``PubmedArticle`` elements out of a ``PubmedArticleSet``.
+
+    ``source`` is a file name or a binary file object (e.g. a raw HTTP
+    response). Each element is complete when yielded and is cleared as soon
+    as the caller asks for the next one, so memory stays flat however large
+    the payload is. Raises ``ET.ParseError`` at the point the XML breaks.
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    _, root = next(context)
+
+    for event, elem in context:
+        if event != "end" or elem.tag not in _RECORD_TAGS:
+            continue
+        if elem.tag == "PubmedArticle":
+            yield elem
+        elem.clear()
+        root.clear()
+
+
+def _read_author(author: ET.Element) -> Tuple[str, str, str, Tuple[str, ...], Tuple[str, ...], str]:
+    """Return ``(name, fore_name, initials, affiliations, emails, orcid)`` in one pass over ``author``."""
+    last_name = suffix = collective_name = fore_name = initials = orcid = ""
+    affiliations: List[str] = []
+    emails: List[str] = []
+
+    for child in author:
+        if child.tag == "LastName":
+            last_name = child.text or ""
+        elif child.tag == "ForeName":
+            fore_name = child.text or ""
+        elif child.tag == "Initials":
+            initials = child.text or ""
+        elif child.tag == "Suffix":
+            suffix = (child.text or "").strip()
+        elif child.tag == "CollectiveName":
+            collective_name = "".join(child.itertext()).strip()
+        elif child.tag == "Identifier" and child.get("Source") == "ORCID":
+            match = ORCID_PATTERN.search(child.text or "")
+            orcid = match.group(0) if match else (child.text or "").strip()
+        elif child.tag == "ElectronicAddress" and child.text:
+            emails.append(child.text.strip())
+        elif child.tag == "AffiliationInfo":
+            for info in child:
+                if info.tag == "Affiliation":
+                    text = "".join(info.itertext()).strip()
+                    if text:
+                        affiliations.append(text)
+                        emails.extend(EMAIL_PATTERN.findall(text))
+                elif info.tag == "ElectronicAddress" and info.text:
+                    emails.append(info.text.strip())
+
+    # Keep the suffix, or "Smith Jr" and "Smith" would read as one author.
+    name = f"{last_name} {suffix}" if last_name and suffix else last_name or collective_name or "Unknown"
+    return name, fore_name, initials, tuple(affiliations), tuple(dict.fromkeys(emails)), orcid
+
+def parse_article(article: ET.Element, include_academic: bool = False) -> Optional[PaperRecord]:
+    """Extract a paper record from a ``PubmedArticle`` element.
+
+    Returns None for papers with no company authors unless
+    ``include_academic`` is set.
+    """
+    citation = article.find("MedlineCitation")
+    pmid = citation.findtext("PMID", default="Unknown")
+    details = citation.find("Article")
+
+    title_element = details.find("ArticleTitle")
+    title = "".join(title_element.itertext()) if title_element is not None else "Unknown"
+
+    pub_date = details.findtext("Journal/JournalIssue/PubDate/Year", default="Unknown")
+
+    people = [_read_author(author) for author in details.iterfind("AuthorList/Author")]
+    affiliations = [affiliation for person in people for affiliation in person[3]]
+
+    start = time.perf_counter()
+    flags = iter(classify_affiliations(affiliations))
+    METRICS.observe("classify", time.perf_counter() - start, calls=len(affiliations))
+
+    authors = []
+    for name, fore_name, initials, own_affiliations, emails, orcid in people:
+        company = [affiliation for affiliation in own_affiliations if next(flags)]
+        primary = company[0] if company else own_affiliations[0] if own_affiliations else ""
+        authors.append(AuthorRecord(
+            name, primary, bool(company), fore_name=fore_name, initials=initials,
+            affiliations=own_affiliations, emails=emails, orcid=orcid
+        ))
+
+    # PubMed has no corresponding-author flag; the author given an address is it.
+    corresponding_email = next((author.emails[0] for author in authors if author.emails), "Unknown")
+    paper = PaperRecord(pmid, title, pub_date, tuple(authors), corresponding_email)
+    if not (include_academic or paper.is_company):
+        return None
+    return paper
+
+
+def parse_articles(source: Union[str, BinaryIO]) -> Iterator[PaperRecord]:
+    """Stream paper records with non-academic authors out of a ``PubmedArticleSet``."""
+    for article in iter_articles(source):
+        paper = parse_article(article)
+        if paper is not None:
+            yield paper
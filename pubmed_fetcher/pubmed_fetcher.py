@@ -1,616 +1,473 @@
-import requests
-import pandas as pd
+import asyncio
+import io
+import multiprocessing
+import os
+import time
 import xml.etree.ElementTree as ET
-from typing import List, Dict
-
-
-PUBMED_SUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
-PUBMED_API_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
-PUBMED_DETAILS_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
-
-# Define keywords to detect companies and filter out universities
-COMPANY_KEYWORDS = ["inc", "pharma", "biotech", "corp", "ltd", "gmbh", "s.a.", "research institute", "therapeutics", "biosciences"]
-ACADEMIC_KEYWORDS = ["university", "college", "school", "institute of technology", "hospital", "med school"]
-
-def fetch_pubmed_ids(query: str) -> List[str]:
-    params = {
-        "db": "pubmed",
-        "term": query,
-        "retmax": 10,
-        "retmode": "json"
-    }
-    response = requests.get(PUBMED_API_URL, params=params)
-    response.raise_for_status()
-    data = response.json()
-    return data.get("esearchresult", {}).get("idlist", [])
-
-def fetch_paper_details(pubmed_ids: List[str]) -> List[Dict]:
-    print("✅ Function Started: fetch_paper_details()")
-
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get(PUBMED_DETAILS_URL, params=params)
-        response.raise_for_status()
-
-        
-        print(f"📄 API Response for {pmid} (First 500 chars):\n{response.text[:500]}\n")
-
-        
-        with open(f"debug_{pmid}.xml", "w", encoding="utf-8") as f:
-            f.write(response.text)
-
-       
-        import xml.etree.ElementTree as ET  
-
-        try:
-            root = ET.fromstring(response.text)  # ✅ Proper XML Parsing
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  
-
-        
-        title_element = root.find(".//ArticleTitle")
-        title = title_element.text if title_element is not None else "Unknown"
-
-        
-        pub_date_element = root.find(".//PubDate/Year")
-        pub_date = pub_date_element.text if pub_date_element is not None else "Unknown"
-
-        papers.append({
-            "PubmedID": pmid,
-            "Title": title,
-            "Publication Date": pub_date,
-            "Non-academic Author(s)": "TBD",
-            "Company Affiliation(s)": "TBD",
-            "Corresponding Author Email": "TBD"
-        })
-
-    return papers
-
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    print("✅ Function Started: fetch_paper_details()")
-
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", params=params)
-        response.raise_for_status()
-
-        print(f"📄 API Response Received for {pmid} (First 500 chars): {response.text[:500]}")
-
-        # ✅ Save XML response for debugging
-        with open(f"debug_{pmid}.xml", "w", encoding="utf-8") as f:
-            f.write(response.text)
-
-        # ✅ Fix: Ensure `ET` is referenced correctly before using it
-        try:
-            root = ET.fromstring(response.text)  # ✅ Proper XML Parsing
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        # Extract Title
-        title_element = root.find(".//ArticleTitle")
-        title = title_element.text if title_element is not None else "Unknown"
-
-        # Extract Publication Date
-        pub_date_element = root.find(".//PubDate/Year")
-        pub_date = pub_date_element.text if pub_date_element is not None else "Unknown"
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Callable, List, Dict, AsyncIterator, BinaryIO, Iterable, Iterator, Optional, Tuple, TypeVar
 
-        # Extract Authors & Affiliations
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName")
-            name_text = name.text if name is not None else "Unknown"
-
-            affiliation = author.find(".//Affiliation")
-            affiliation_text = affiliation.text.lower() if affiliation is not None else ""
-
-            if any(word in affiliation_text for word in ["inc", "pharma", "biotech", "corp", "ltd", "gmbh", "s.a.", "therapeutics", "biosciences"]):
-                non_academic_authors.append(name_text)
-                company_affiliations.append(affiliation_text)
-
-        papers.append({
-            "PubmedID": pmid,
-            "Title": title,
-            "Publication Date": pub_date,
-            "Non-academic Author(s)": ", ".join(non_academic_authors) if non_academic_authors else "None",
-            "Company Affiliation(s)": ", ".join(company_affiliations) if company_affiliations else "None",
-            "Corresponding Author Email": "Unknown"  # You may need to extract this separately
-        })
-
-    return papers
-
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    print("✅ Function Started: fetch_paper_details()")
-    
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", params=params)
-        response.raise_for_status()
-
-        print(f"📄 API Response Received for {pmid} (First 500 chars): {response.text[:500]}")
-
-        # ✅ DEBUG: Save XML response to check manually
-        with open(f"debug_{pmid}.xml", "w", encoding="utf-8") as f:
-            f.write(response.text)
-
-        # ✅ FIX: Make sure ET is being referenced correctly before using it
-        try:
-            root = ET.fromstring(response.text)  # ✅ Fix XML Parsing
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        # Extract Title
-        title_element = root.find(".//ArticleTitle")
-        title = title_element.text if title_element is not None else "Unknown"
-
-        # Extract Publication Date
-        pub_date_element = root.find(".//PubDate/Year")
-        pub_date = pub_date_element.text if pub_date_element is not None else "Unknown"
-
-        # Extract Authors & Affiliations
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName")
-            name_text = name.text if name is not None else "Unknown"
-
-            affiliation = author.find(".//Affiliation")
-            affiliation_text = affiliation.text.lower() if affiliation is not None else ""
-
-            if any(word in affiliation_text for word in ["inc", "pharma", "biotech", "corp", "ltd", "gmbh", "s.a.", "therapeutics", "biosciences"]):
-                non_academic_authors.append(name_text)
-                company_affiliations.append(affiliation_text)
-
-        papers.append({
-            "PubmedID": pmid,
-            "Title": title,
-            "Publication Date": pub_date,
-            "Non-academic Author(s)": ", ".join(non_academic_authors) if non_academic_authors else "None",
-            "Company Affiliation(s)": ", ".join(company_affiliations) if company_affiliations else "None",
-            "Corresponding Author Email": "Unknown"  # You may need to extract this separately
-        })
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    print("✅ Function Started: fetch_paper_details()")
-    
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", params=params)
-        response.raise_for_status()
-
-        print(f"📄 API Response Received for {pmid} (First 500 chars): {response.text[:500]}")
-
-        # ✅ DEBUG: Save response to a file to manually check XML structure
-        with open(f"debug_{pmid}.xml", "w", encoding="utf-8") as f:
-            f.write(response.text)
-
-        try:
-            root = ET.fromstring(response.text)  # ✅ Fix XML Parsing
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        # Extract Title
-        title_element = root.find(".//ArticleTitle")
-        title = title_element.text if title_element is not None else "Unknown"
-
-        # Extract Publication Date
-        pub_date_element = root.find(".//PubDate")
-        pub_date = pub_date_element.text if pub_date_element is not None else "Unknown"
-
-        papers.append({
-            "PubmedID": pmid,
-            "Title": title,
-            "Publication Date": pub_date,
-            "Non-academic Author(s)": "Unknown",  # Update this logic later
-            "Company Affiliation(s)": "Unknown",  # Update this logic later
-            "Corresponding Author Email": "Unknown"
-        })
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    print("✅ Function Started: fetch_paper_details()")
-    
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", params=params)
-        response.raise_for_status()
-
-        print(f"📄 API Response Received for {pmid} (First 500 chars): {response.text[:500]}")
-
-        try:
-            root = ET.ElementTree(ET.fromstring(response.text))  # ✅ Fix XML Parsing
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        # Extract Title
-        title_element = root.find(".//ArticleTitle")
-        title = title_element.text if title_element is not None else "Unknown"
-
-        # Extract Publication Date
-        pub_date_element = root.find(".//PubDate")
-        pub_date = pub_date_element.text if pub_date_element is not None else "Unknown"
-
-        papers.append({
-            "PubmedID": pmid,
-            "Title": title,
-            "Publication Date": pub_date,
-            "Non-academic Author(s)": "Unknown",  # Update this logic later
-            "Company Affiliation(s)": "Unknown",  # Update this logic later
-            "Corresponding Author Email": "Unknown"
-        })
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    print("✅ Function Started: fetch_paper_details()")
-    
-    papers = []
-
-    for pmid in pubmed_ids:
-        print(f"📌 Fetching details for PubMed ID: {pmid}")
-
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", params=params)
-        response.raise_for_status()
-
-        print(f"📄 API Response Received for {pmid} (First 500 chars): {response.text[:500]}")
-
-        try:
-            root = ET.ElementTree(ET.fromstring(response.text))  # ✅ Debug here
-            print(f"✅ XML Parsed Successfully for PubMed ID: {pmid}")
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
+import requests
 
-    for pmid in pubmed_ids:
+from pubmed_fetcher.cache import ArticleCache
+from pubmed_fetcher.capture import DebugCapture
+from pubmed_fetcher.client import EutilsClient, get_default_client
+from pubmed_fetcher.index import ArticleIndex
+from pubmed_fetcher.journal import ProgressJournal
+from pubmed_fetcher.metrics import METRICS, TimedReader
+from pubmed_fetcher.organizations import OrganizationResolver
+from pubmed_fetcher.parser import COMPANY_KEYWORDS, ACADEMIC_KEYWORDS, iter_articles, parse_article
+from pubmed_fetcher.records import PaperRecord
+from pubmed_fetcher.sinks import CsvSink
+
+
+# Set PUBMED_EUTILS_URL to point every request at a stand-in server, such as the bundled mock.
+EUTILS_BASE_URL = os.environ.get("PUBMED_EUTILS_URL", "https://eutils.ncbi.nlm.nih.gov/entrez/eutils").rstrip("/")
+
+PUBMED_SUMMARY_URL = f"{EUTILS_BASE_URL}/esummary.fcgi"
+PUBMED_API_URL = f"{EUTILS_BASE_URL}/esearch.fcgi"
+PUBMED_DETAILS_URL = f"{EUTILS_BASE_URL}/efetch.fcgi"
+
+# ESearch page size, and the deepest offset PubMed lets retstart reach.
+ESEARCH_PAGE_SIZE = 500
+ESEARCH_MAX_RESULTS = 10000
+ESEARCH_DATE_FORMAT = "%Y/%m/%d"
+
+# Number of PubMed IDs sent in a single EFetch request. The IDs are POSTed,
+# so the batch size is bounded by NCBI's per-request limits, not URL length.
+EFETCH_BATCH_SIZE = 200
+
+# Batches that may wait for a parse worker, per worker, before fetching pauses.
+PARSE_QUEUE_FACTOR = 2
+
+T = TypeVar("T")
+
+def iter_pubmed_ids(
+    query: str,
+    max_results: Optional[int] = None,
+    page_size: int = ESEARCH_PAGE_SIZE,
+    client: Optional[EutilsClient] = None,
+    mindate: Optional[str] = None,
+    maxdate: Optional[str] = None,
+    datetype: str = "edat"
+) -> Iterator[str]:
+    """Yield PubMed IDs matching ``query``, paging through the result set with ``retstart``.
+
+    With ``max_results=None`` the whole result set is walked. Pages are only
+    requested as the caller consumes IDs, so downstream stages can start on
+    the first page before the last one has been fetched. ``mindate`` and
+    ``maxdate`` (``YYYY/MM/DD``) restrict the search to a ``datetype`` range;
+    ``maxdate`` defaults to today when only ``mindate`` is given.
+    """
+    client = client or get_default_client()
+    limit = ESEARCH_MAX_RESULTS if max_results is None else min(max_results, ESEARCH_MAX_RESULTS)
+    retstart = 0
+
+    while retstart < limit:
         params = {
             "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
+            "term": query,
+            "retstart": retstart,
+            "retmax": min(page_size, limit - retstart),
+            "retmode": "json"
         }
-        response = requests.get(PUBMED_DETAILS_URL, params=params)
-        response.raise_for_status()
-
-        try:
-            # ✅ Fix: Explicitly use `ET` inside the function
-            root = ET.ElementTree(ET.fromstring(response.text))
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for PubMed ID {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        title = root.find(".//ArticleTitle")
-        title = title.text if title is not None else "Unknown"
-
-        pub_date = root.find(".//PubDate")
-        pub_date = pub_date.text if pub_date is not None else "Unknown"
-
-        non_academic_authors = []
-        company_affiliations = []
-        corresponding_email = "Unknown"
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName")
-            name = name.text if name is not None else "Unknown"
-
-            affiliation = author.find(".//Affiliation")
-            affiliation = affiliation.text if affiliation is not None else ""
-
-            email = author.find(".//ElectronicAddress")
-            if email is not None:
-                corresponding_email = email.text
-
-            if any(word in affiliation.lower() for word in COMPANY_KEYWORDS) and not any(word in affiliation.lower() for word in ACADEMIC_KEYWORDS):
-                non_academic_authors.append(name)
-                company_affiliations.append(affiliation)
-
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": corresponding_email
+        if mindate is not None:
+            params.update({
+                "datetype": datetype,
+                "mindate": mindate,
+                "maxdate": maxdate or date.today().strftime(ESEARCH_DATE_FORMAT)
             })
+        with METRICS.timer("esearch"):
+            response = client.get(PUBMED_API_URL, params=params)
+            result = response.json().get("esearchresult", {})
+        METRICS.increment("bytes_received", len(response.content))
+        ids = result.get("idlist", [])
+        count = int(result.get("count", 0))
+
+        yield from ids
+
+        retstart += len(ids)
+        if not ids or retstart >= count:
+            return
+
+    if max_results is None or max_results > ESEARCH_MAX_RESULTS:
+        print(f"⚠️ Stopped after {ESEARCH_MAX_RESULTS} IDs: esearch cannot page further, narrow the query (e.g. by date).")
+
+def fetch_pubmed_ids(query: str, max_results: Optional[int] = 10, client: Optional[EutilsClient] = None) -> List[str]:
+    """Return up to ``max_results`` PubMed IDs for ``query`` (all of them if None)."""
+    return list(iter_pubmed_ids(query, max_results=max_results, client=client))
+
+def _chunked(items: Iterable[str], size: int) -> Iterator[List[str]]:
+    """Yield successive lists of at most ``size`` items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _fetch_batch(pmids: List[str], client: EutilsClient, consume: Callable[[TimedReader], T]) -> T:
+    """Request the ``PubmedArticleSet`` XML for a batch of PubMed IDs and return ``consume`` of its streamed body.
+
+    A connection that drops mid-body refetches the batch, so ``consume``
+    starts over on a fresh body and must not keep a failed attempt's state.
+    """
+    data = {
+        "db": "pubmed",
+        "id": ",".join(pmids),
+        "retmode": "xml"
+    }
+    sent = time.perf_counter()
 
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
-
-    for pmid in pubmed_ids:
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get(PUBMED_DETAILS_URL, params=params)
-        response.raise_for_status()
-
+    def read(response: requests.Response) -> T:
+        nonlocal sent
+        # Time to the headers; the body's reads are charged by the TimedReader.
+        METRICS.observe("efetch", time.perf_counter() - sent)
+        response.raw.decode_content = True
         try:
-            root = ET.fromstring(response.text)  # ✅ Ensure XML is parsed correctly
-        except ET.ParseError as e:
-            print(f"❌ XML Parsing Error for PubMed ID {pmid}: {e}")
-            continue  # Skip this PubMed ID if XML is broken
-
-        title = root.find(".//ArticleTitle").text if root.find(".//ArticleTitle") is not None else "Unknown"
-        pub_date = root.find(".//PubDate").text if root.find(".//PubDate") is not None else "Unknown"
-
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName").text if author.find("LastName") is not None else "Unknown"
-            affiliation = author.find(".//Affiliation").text if author.find(".//Affiliation") is not None else ""
-
-            if any(word in affiliation.lower() for word in COMPANY_KEYWORDS) and not any(word in affiliation.lower() for word in ACADEMIC_KEYWORDS):
-                non_academic_authors.append(name)
-                company_affiliations.append(affiliation)
-
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": "Unknown"
-            })
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
-
-    for pmid in pubmed_ids:
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get(PUBMED_DETAILS_URL, params=params)
-        response.raise_for_status()
-
-        # ✅ FIX: Ensure XML parsing is done properly
+            return consume(TimedReader(response.raw, METRICS))
+        finally:
+            sent = time.perf_counter()
+
+    return client.post_stream(PUBMED_DETAILS_URL, read, data=data)
+
+@dataclass
+class _ParsedBatch:
+    """What parsing one batch produced, handed from a parser (or parse worker) to :func:`_finish_batch`."""
+
+    # Every article seen, academic or not.
+    records: Dict[str, PaperRecord]
+    # Raw XML of freshly fetched articles, kept only when asked for.
+    fetched: Dict[str, bytes]
+    # Why the payload stopped parsing, if it did, and the payload itself when it was in memory.
+    error: Optional[str] = None
+    payload: Optional[bytes] = None
+
+def _parse_batch(
+    cached: Dict[str, bytes],
+    missing: List[str],
+    source: Optional[BinaryIO],
+    keep_raw: bool = False
+) -> _ParsedBatch:
+    """Parse a batch's cached articles and its EFetch payload.
+
+    ``keep_raw`` re-serializes each fetched article for the cache or a
+    debug capture; it is skipped otherwise, as it costs about as much as
+    parsing. Time spent waiting on a :class:`TimedReader` source is left to
+    its own stage rather than charged to ``parse``.
+    """
+    start = time.perf_counter()
+    parsed = _ParsedBatch(
+        records={pmid: parse_article(ET.fromstring(xml), include_academic=True) for pmid, xml in cached.items()},
+        fetched={}
+    )
+
+    if source is not None:
         try:
-            root = ET.fromstring(response.text)
+            for article in iter_articles(source):
+                pmid = article.findtext("MedlineCitation/PMID")
+                if keep_raw:
+                    parsed.fetched[pmid] = ET.tostring(article, encoding="utf-8", xml_declaration=False)
+                parsed.records[pmid] = parse_article(article, include_academic=True)
         except ET.ParseError as e:
-            print(f"❌ Error parsing XML for PubMed ID {pmid}: {e}")
-            continue
-
-        title = root.find(".//ArticleTitle").text if root.find(".//ArticleTitle") is not None else "Unknown"
-        pub_date = root.find(".//PubDate").text if root.find(".//PubDate") is not None else "Unknown"
-
-        non_academic_authors = []
-        company_affiliations = []
-        corresponding_email = "Unknown"
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName").text if author.find("LastName") is not None else "Unknown"
-            affiliation = author.find(".//Affiliation").text if author.find(".//Affiliation") is not None else ""
-
-            email = author.find(".//ElectronicAddress")
-            if email is not None:
-                corresponding_email = email.text
-
-            if any(word in affiliation.lower() for word in COMPANY_KEYWORDS) and not any(word in affiliation.lower() for word in ACADEMIC_KEYWORDS):
-                non_academic_authors.append(name)
-                company_affiliations.append(affiliation)
-
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": corresponding_email
-            })
-
-    return papers
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
-
-    for pmid in pubmed_ids:
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "xml"
-        }
-        response = requests.get(PUBMED_DETAILS_URL, params=params)
-        response.raise_for_status()
-        
-        # 🔍 Print response text for debugging
-        print(f"Response for {pmid}: {response.text[:500]}...")  # Print first 500 chars
-
-        # Parse XML response (PubMed provides affiliations in XML format)
-        import xml.etree.ElementTree as ET
-        root = ET.fromstring(response.text)
-
-        title = root.find(".//ArticleTitle").text if root.find(".//ArticleTitle") is not None else "Unknown"
-        pub_date = root.find(".//PubDate").text if root.find(".//PubDate") is not None else "Unknown"
-        
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in root.findall(".//Author"):
-            name = author.find("LastName").text if author.find("LastName") is not None else "Unknown"
-            affiliation = author.find(".//Affiliation").text if author.find(".//Affiliation") is not None else ""
-
-            print(f"Author: {name}, Affiliation: {affiliation}")
-
-            # Check if affiliation belongs to a company
-            if any(word in affiliation.lower() for word in COMPANY_KEYWORDS) and not any(word in affiliation.lower() for word in ACADEMIC_KEYWORDS):
-                non_academic_authors.append(name)
-                company_affiliations.append(affiliation)
-
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": "Unknown"
-            })
-
-    return papers
-
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
-    
-    for pmid in pubmed_ids:
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "json"
-        }
-        response = requests.get(PUBMED_SUMMARY_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
-        
-        # 🔍 Print the full response to understand its structure
-        print(f"Response for {pmid}: {data}")
-
-        paper_info = data.get("result", {}).get(pmid, {})
-
-        title = paper_info.get("title", "Unknown")
-        pub_date = paper_info.get("pubdate", "Unknown")
-        authors = paper_info.get("authors", [])
-
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in authors:
-            if "affiliation" in author:
-                affiliation = author["affiliation"].lower()
-
-                # Check if the affiliation is a company
-                if any(word in affiliation for word in COMPANY_KEYWORDS) and not any(word in affiliation for word in ACADEMIC_KEYWORDS):
-                    non_academic_authors.append(author["name"])
-                    company_affiliations.append(affiliation)
-
-        # **Filter out papers without non-academic authors**
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": "Unknown"
-            })
-
+            print(f"❌ XML Parsing Error for batch {missing[0]}..{missing[-1]}: {e}")
+            parsed.error = str(e)
+            if isinstance(source, io.BytesIO):
+                parsed.payload = source.getvalue()
+
+    read_seconds = source.seconds if isinstance(source, TimedReader) else 0.0
+    METRICS.observe("parse", time.perf_counter() - start - read_seconds)
+    METRICS.increment("articles_parsed", len(parsed.records))
+    return parsed
+
+def _parse_payload(cached: Dict[str, bytes], missing: List[str], payload: Optional[bytes], keep_raw: bool = False):
+    """Process-pool entry point: :func:`_parse_batch` over an already downloaded payload.
+
+    Returns the parsed batch and this worker's metrics for it, for the
+    parent to merge with :func:`_from_worker`.
+    """
+    METRICS.reset()
+    parsed = _parse_batch(cached, missing, io.BytesIO(payload) if payload is not None else None, keep_raw)
+    return parsed, METRICS.snapshot()
+
+def _process_pool(workers: int) -> ProcessPoolExecutor:
+    """Parse-worker pool. Workers are spawned, not forked: the parent has
+    threads (fetches, the capture writer) that may hold the metrics, cache
+    or SQLite locks at fork time, and a forked child would inherit them
+    held for good."""
+    return ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+
+def _from_worker(result) -> _ParsedBatch:
+    """Merge a parse worker's metrics into this process's and return its parsed batch.
+
+    Unpickling skips ``__post_init__``, so the records are rebuilt here to
+    share interned affiliation strings again.
+    """
+    parsed, snapshot = result
+    METRICS.merge(snapshot)
+    parsed.records = {
+        pmid: replace(record, authors=tuple(map(replace, record.authors)))
+        for pmid, record in parsed.records.items()
+    }
+    return parsed
+
+def _lookup_batch(batch: List[str], cache: Optional[ArticleCache]) -> Tuple[Dict[str, bytes], List[str]]:
+    """Split a batch into cached article XML and the IDs that still need fetching."""
+    cached = cache.get_many(batch) if cache is not None else {}
+    missing = [pmid for pmid in batch if pmid not in cached]
+    if missing:
+        print(f"📌 Fetching details for {len(missing)} PubMed IDs ({missing[0]}..{missing[-1]})")
+    return cached, missing
+
+def _download_batch(
+    batch: List[str],
+    client: EutilsClient,
+    cache: Optional[ArticleCache]
+) -> Tuple[Dict[str, bytes], List[str], Optional[bytes]]:
+    """Look a batch up in the cache and read the rest from EFetch in full, for a parse worker."""
+    cached, missing = _lookup_batch(batch, cache)
+    payload = None
+    if missing:
+        payload = _fetch_batch(missing, client, lambda body: body.read())
+    return cached, missing, payload
+
+def _finish_batch(
+    batch: List[str],
+    parsed: _ParsedBatch,
+    cache: Optional[ArticleCache],
+    journal: Optional[ProgressJournal],
+    index: Optional[ArticleIndex],
+    capture: Optional[DebugCapture],
+    organizations: Optional[OrganizationResolver] = None
+) -> List[PaperRecord]:
+    """Store, resolve, index, capture and journal a parsed batch; return its company records in request order."""
+    if cache is not None:
+        cache.put_many(parsed.fetched)
+    if organizations is not None:
+        parsed.records = dict(zip(parsed.records, organizations.annotate(parsed.records.values())))
+    if index is not None:
+        index.add_many(parsed.records.values())
+    if capture is not None:
+        capture.articles(parsed.fetched)
+        if parsed.error is not None and parsed.payload is not None:
+            capture.failure(f"{batch[0]}-{batch[-1]}", parsed.error, parsed.payload)
+
+    papers = [parsed.records[pmid] for pmid in batch if pmid in parsed.records and parsed.records[pmid].is_company]
+    if journal is not None and parsed.error is None:
+        journal.record(batch, papers)
     return papers
 
-    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors."""
-    papers = []
-    
-    for pmid in pubmed_ids:
-        params = {
-            "db": "pubmed",
-            "id": pmid,
-            "retmode": "json"
-        }
-        response = requests.get(PUBMED_SUMMARY_URL, params=params)
-        response.raise_for_status()
-        data = response.json()
-        paper_info = data.get("result", {}).get(pmid, {})
-
-        title = paper_info.get("title", "Unknown")
-        pub_date = paper_info.get("pubdate", "Unknown")
-        authors = paper_info.get("authors", [])
-
-        non_academic_authors = []
-        company_affiliations = []
-
-        for author in authors:
-            if "affiliation" in author:
-                affiliation = author["affiliation"].lower()
-
-                # Check if the affiliation is a company
-                if any(word in affiliation for word in COMPANY_KEYWORDS) and not any(word in affiliation for word in ACADEMIC_KEYWORDS):
-                    non_academic_authors.append(author["name"])
-                    company_affiliations.append(affiliation)
-
-        # **Filter out papers without non-academic authors**
-        if non_academic_authors:
-            papers.append({
-                "PubmedID": pmid,
-                "Title": title,
-                "Publication Date": pub_date,
-                "Non-academic Author(s)": ", ".join(non_academic_authors),
-                "Company Affiliation(s)": ", ".join(company_affiliations),
-                "Corresponding Author Email": "Unknown"
-            })
-    
-    return papers
+def _fetch_and_parse_batch(
+    batch: List[str],
+    client: EutilsClient,
+    cache: Optional[ArticleCache] = None,
+    journal: Optional[ProgressJournal] = None,
+    index: Optional[ArticleIndex] = None,
+    capture: Optional[DebugCapture] = None,
+    organizations: Optional[OrganizationResolver] = None
+) -> List[PaperRecord]:
+    """Fetch one EFetch batch and return the records that have non-academic authors.
+
+    Articles found in ``cache`` are parsed from there; only the rest go over
+    the network, streamed straight into the parser, and what comes back is
+    stored for next time. Every parsed article, academic or not, goes into
+    ``index``, after ``organizations`` has resolved the company names of
+    its company authors. A batch that parsed cleanly is then logged to ``journal``;
+    one that did not is left out so a resumed crawl tries it again. With a
+    ``capture`` the payload is read whole instead of streamed, so that it
+    can be saved if it fails to parse.
+    """
+    keep_raw = cache is not None or capture is not None
+
+    if capture is not None:
+        cached, missing, payload = _download_batch(batch, client, cache)
+        parsed = _parse_batch(cached, missing, io.BytesIO(payload) if payload is not None else None, keep_raw)
+    else:
+        cached, missing = _lookup_batch(batch, cache)
+        if missing:
+            parsed = _fetch_batch(missing, client, lambda body: _parse_batch(cached, missing, body, keep_raw))
+        else:
+            parsed = _parse_batch(cached, missing, None)
+
+    return _finish_batch(batch, parsed, cache, journal, index, capture, organizations)
+
+def _pending(pubmed_ids: Iterable[str], journal: Optional[ProgressJournal]) -> Iterable[str]:
+    """Drop IDs whose batch the journal already records as finished."""
+    if journal is None:
+        return pubmed_ids
+    return (pmid for pmid in pubmed_ids if pmid not in journal.done)
+
+def iter_paper_details(
+    pubmed_ids: Iterable[str],
+    batch_size: int = EFETCH_BATCH_SIZE,
+    client: Optional[EutilsClient] = None,
+    cache: Optional[ArticleCache] = None,
+    journal: Optional[ProgressJournal] = None,
+    index: Optional[ArticleIndex] = None,
+    capture: Optional[DebugCapture] = None,
+    organizations: Optional[OrganizationResolver] = None,
+    workers: int = 0
+) -> Iterator[List[PaperRecord]]:
+    """Yield the records with non-academic authors one EFetch batch at a time.
+
+    IDs are sent to EFetch ``batch_size`` at a time and the returned
+    ``PubmedArticleSet`` is split back into one record per ``PubmedArticle``.
+    With a ``cache``, articles already on disk skip the network entirely.
+    With a ``journal``, each finished batch is logged as it completes; IDs
+    it already holds are skipped and its records are yielded first. With
+    an ``index``, every parsed article is recorded there as a side effect.
+    With ``organizations``, company authors get their canonical company
+    name, resolved once per distinct affiliation.
+    With a ``capture``, sampled raw articles and failed payloads are saved
+    in the background.
+
+    With ``workers > 0``, payloads are downloaded whole and parsed in a
+    pool of that many processes while this one goes on fetching; up to
+    ``PARSE_QUEUE_FACTOR * workers`` batches may be queued for parsing.
+    """
+    client = client or get_default_client()
+    chunks = _chunked(_pending(pubmed_ids, journal), batch_size)
+
+    if journal is not None and journal.papers:
+        yield list(journal.papers)
+
+    if not workers:
+        for batch in chunks:
+            yield _fetch_and_parse_batch(batch, client, cache, journal, index, capture, organizations)
+        return
+
+    keep_raw = cache is not None or capture is not None
+    with _process_pool(workers) as pool:
+        pending = deque()
+        for batch in chunks:
+            pending.append((batch, pool.submit(_parse_payload, *_download_batch(batch, client, cache), keep_raw)))
+            while pending and (len(pending) > PARSE_QUEUE_FACTOR * workers or pending[0][1].done()):
+                done, future = pending.popleft()
+                yield _finish_batch(done, _from_worker(future.result()), cache, journal, index, capture, organizations)
+
+        while pending:
+            done, future = pending.popleft()
+            yield _finish_batch(done, _from_worker(future.result()), cache, journal, index, capture, organizations)
+
+def fetch_paper_details(
+    pubmed_ids: Iterable[str],
+    batch_size: int = EFETCH_BATCH_SIZE,
+    client: Optional[EutilsClient] = None,
+    cache: Optional[ArticleCache] = None,
+    journal: Optional[ProgressJournal] = None,
+    index: Optional[ArticleIndex] = None,
+    capture: Optional[DebugCapture] = None,
+    organizations: Optional[OrganizationResolver] = None,
+    workers: int = 0
+) -> List[PaperRecord]:
+    """Fetch details for a list of PubMed IDs and filter papers with non-academic authors.
+
+    Collects :func:`iter_paper_details` into one list; stream the batches
+    into a sink instead when the result set is large.
+    """
+    print("✅ Function Started: fetch_paper_details()")
 
-def save_to_csv(papers: List[Dict], filename: str):
-    df = pd.DataFrame(papers)
-    df.to_csv(filename, index=False, encoding="utf-8-sig")
+    batches = iter_paper_details(pubmed_ids, batch_size=batch_size, client=client, cache=cache, journal=journal, index=index, capture=capture, organizations=organizations, workers=workers)
+    return [paper for papers in batches for paper in papers]
+
+async def aiter_paper_details(
+    pubmed_ids: Iterable[str],
+    batch_size: int = EFETCH_BATCH_SIZE,
+    concurrency: int = 3,
+    client: Optional[EutilsClient] = None,
+    cache: Optional[ArticleCache] = None,
+    journal: Optional[ProgressJournal] = None,
+    index: Optional[ArticleIndex] = None,
+    capture: Optional[DebugCapture] = None,
+    organizations: Optional[OrganizationResolver] = None,
+    workers: int = 0
+) -> AsyncIterator[List[PaperRecord]]:
+    """Concurrent variant of :func:`iter_paper_details`.
+
+    Up to ``concurrency`` EFetch batches are in flight at once; the client's
+    token bucket keeps request starts under the NCBI rate limit. Batches are
+    yielded in request order, so at most ``concurrency`` finished batches
+    are ever held in memory. ``workers`` moves parsing into a process pool
+    as in the sequential version.
+
+    The blocking HTTP and SQLite calls run on a thread pool of its own,
+    sized to ``concurrency``, rather than on the event loop's default
+    executor, whose ``min(32, cpu_count + 4)`` threads would otherwise
+    silently cap the batches in flight.
+    """
+    client = client or get_default_client()
+    chunks = _chunked(_pending(pubmed_ids, journal), batch_size)
+    pool = _process_pool(workers) if workers else None
+    # One thread per batch in flight, plus one to pull the next chunk of IDs.
+    threads = ThreadPoolExecutor(concurrency + 1)
+    loop = asyncio.get_running_loop()
+    keep_raw = cache is not None or capture is not None
+
+    async def run(batch: List[str]) -> List[PaperRecord]:
+        if pool is None:
+            return await loop.run_in_executor(threads, _fetch_and_parse_batch, batch, client, cache, journal, index, capture, organizations)
+        downloaded = await loop.run_in_executor(threads, _download_batch, batch, client, cache)
+        result = await loop.run_in_executor(pool, _parse_payload, *downloaded, keep_raw)
+        return await loop.run_in_executor(threads, _finish_batch, batch, _from_worker(result), cache, journal, index, capture, organizations)
+
+    if journal is not None and journal.papers:
+        yield list(journal.papers)
+
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                # The IDs may come from a paging esearch generator, so pull them off the loop.
+                batch = await loop.run_in_executor(threads, next, chunks, None)
+                if batch is None:
+                    exhausted = True
+                else:
+                    pending.append(asyncio.create_task(run(batch)))
+
+            if not pending:
+                return
+
+            yield await pending.popleft()
+    finally:
+        # Reached on errors and when the consumer stops early (break, aclose()) alike.
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        threads.shutdown(wait=False, cancel_futures=True)
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+async def async_fetch_paper_details(
+    pubmed_ids: Iterable[str],
+    batch_size: int = EFETCH_BATCH_SIZE,
+    concurrency: int = 3,
+    client: Optional[EutilsClient] = None,
+    cache: Optional[ArticleCache] = None,
+    journal: Optional[ProgressJournal] = None,
+    index: Optional[ArticleIndex] = None,
+    capture: Optional[DebugCapture] = None,
+    organizations: Optional[OrganizationResolver] = None,
+    workers: int = 0
+) -> List[PaperRecord]:
+    """Concurrent variant of :func:`fetch_paper_details`, returning records in the same order."""
+    print("✅ Function Started: async_fetch_paper_details()")
+
+    batches = aiter_paper_details(pubmed_ids, batch_size=batch_size, concurrency=concurrency, client=client, cache=cache, journal=journal, index=index, capture=capture, organizations=organizations, workers=workers)
+    return [paper async for papers in batches for paper in papers]
+
+def save_to_csv(papers: List[PaperRecord], filename: str):
+    with CsvSink(filename) as sink:
+        sink.write(papers)
 
 def main():
     print("Fetching PubMed IDs...")
-    query = "biotechnology"  
+    query = "biotechnology"
     pubmed_ids = fetch_pubmed_ids(query)
     print(f"Fetched {len(pubmed_ids)} PubMed IDs:", pubmed_ids)
 
@@ -628,4 +485,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,38 @@
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token-bucket rate limiter that can be shared by threads.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each acquire takes one token; when the bucket is empty the caller is
+    given a reservation and waits until its token would have been refilled,
+    so waiters are served in arrival order and the long-run rate never
+    exceeds ``rate``.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else 1.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token and return how many seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        """Block the calling thread until a token is available."""
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
@@ -0,0 +1,132 @@
+import sys
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple, Union
+
+
+# Output columns, in the order the sinks write them.
+COLUMNS = (
+    "PubmedID",
+    "Title",
+    "Publication Date",
+    "Non-academic Author(s)",
+    "Company Affiliation(s)",
+    "Corresponding Author Email",
+    "Company Name(s)"
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AuthorRecord:
+    """An author, their affiliations, and whether any of them is a company.
+
+    ``name`` is the last name with any suffix ("Smith Jr"), or the
+    collective name of a group author.
+    ``affiliations`` lists every ``AffiliationInfo`` in order, and
+    ``affiliation`` is the primary one: the first company affiliation if
+    there is one, else the first. ``emails`` gathers ``ElectronicAddress``
+    elements and addresses embedded in the affiliation text; ``orcid`` is
+    the bare ORCID iD. ``organization`` is the canonical company name,
+    filled in for company authors by an ``OrganizationResolver``.
+    """
+
+    name: str
+    affiliation: str
+    is_company: bool = False
+    fore_name: str = ""
+    initials: str = ""
+    affiliations: Tuple[str, ...] = ()
+    emails: Tuple[str, ...] = ()
+    orcid: str = ""
+    organization: str = ""
+
+    def __post_init__(self):
+        # The same institutions recur across thousands of records; share one copy.
+        object.__setattr__(self, "affiliation", sys.intern(self.affiliation))
+        object.__setattr__(self, "affiliations", tuple(map(sys.intern, self.affiliations)))
+        object.__setattr__(self, "emails", tuple(self.emails))
+        object.__setattr__(self, "organization", sys.intern(self.organization))
+
+
+@dataclass(frozen=True, slots=True)
+class PaperRecord:
+    """A parsed paper and all of its authors.
+
+    Authors stay a tuple of :class:`AuthorRecord` until a sink flattens the
+    record into the joined-string columns of :data:`COLUMNS`, which list
+    only the company authors.
+    """
+
+    pmid: str
+    title: str
+    pub_date: str
+    authors: Tuple[AuthorRecord, ...]
+    corresponding_email: str
+
+    @property
+    def company_authors(self) -> Tuple[AuthorRecord, ...]:
+        return tuple(author for author in self.authors if author.is_company)
+
+    @property
+    def is_company(self) -> bool:
+        """True if at least one author has a non-academic, company affiliation."""
+        return any(author.is_company for author in self.authors)
+
+    @property
+    def corresponding_author(self) -> Optional[AuthorRecord]:
+        """The first author with an email address, which PubMed gives the corresponding author."""
+        return next((author for author in self.authors if author.emails), None)
+
+    @property
+    def company_author_names(self) -> Tuple[str, ...]:
+        return tuple(author.name for author in self.company_authors)
+
+    @property
+    def company_affiliations(self) -> Tuple[str, ...]:
+        return tuple(author.affiliation for author in self.company_authors)
+
+    @property
+    def company_organizations(self) -> Tuple[str, ...]:
+        """Distinct resolved company names, in author order."""
+        return tuple(dict.fromkeys(author.organization for author in self.company_authors if author.organization))
+
+    def to_row(self, affiliation_list: bool = False) -> Dict[str, Union[str, list]]:
+        """Flatten to the output columns, joining company authors and affiliations with ", ".
+
+        Affiliations contain commas themselves, so once joined they cannot
+        be told apart again; ``affiliation_list`` keeps them a list instead,
+        for formats that can hold one.
+        """
+        return {
+            "PubmedID": self.pmid,
+            "Title": self.title,
+            "Publication Date": self.pub_date,
+            "Non-academic Author(s)": ", ".join(self.company_author_names),
+            "Company Affiliation(s)": list(self.company_affiliations) if affiliation_list else ", ".join(self.company_affiliations),
+            "Corresponding Author Email": self.corresponding_email,
+            "Company Name(s)": ", ".join(self.company_organizations)
+        }
+
+    def to_dict(self) -> Dict:
+        """Lossless JSON-ready form, with each author kept as a list of its fields in order."""
+        return {
+            "pmid": self.pmid,
+            "title": self.title,
+            "pub_date": self.pub_date,
+            "authors": [
+                [author.name, author.affiliation, author.is_company, author.fore_name,
+                 author.initials, list(author.affiliations), list(author.emails), author.orcid, author.organization]
+                for author in self.authors
+            ],
+            "corresponding_email": self.corresponding_email
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PaperRecord":
+        """Inverse of :meth:`to_dict`; also reads the older ``[name, affiliation, is_company]`` authors."""
+        return cls(
+            pmid=data["pmid"],
+            title=data["title"],
+            pub_date=data["pub_date"],
+            authors=tuple(AuthorRecord(*author) for author in data["authors"]),
+            corresponding_email=data["corresponding_email"]
+        )
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Union
+
+from pubmed_fetcher.classifier import COMPANY_PATTERN, ACADEMIC_PATTERN
+from pubmed_fetcher.sinks import require_pyarrow
+
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+AFFILIATION_COLUMN = "Company Affiliation(s)"
+
+
+def classify_affiliation_column(affiliations: pd.Series) -> pd.DataFrame:
+    """Classify a column of affiliations in bulk.
+
+    A cell is one affiliation string or a list of them, as JSON-lines and
+    Parquet outputs store them. Each affiliation is judged on its own, so
+    one author's academic keyword cannot veto another's company, and the
+    verdicts are reduced per row with any(): ``has_company_keyword``,
+    ``is_academic`` and ``is_non_academic`` (a company keyword without an
+    academic one) boolean columns aligned with ``affiliations``. Each
+    distinct string is matched once with the compiled keyword patterns and
+    the verdicts are broadcast back, so corpora where the same institutions
+    recur millions of times cost only as much as their unique affiliations.
+    """
+    import pandas as pd
+
+    exploded = affiliations.reset_index(drop=True).explode()
+    codes, uniques = pd.factorize(exploded.fillna("").astype(str))
+    uniques = pd.Series(uniques, dtype=object)
+
+    has_company_keyword = uniques.str.contains(COMPANY_PATTERN).to_numpy(dtype=bool)[codes]
+    is_academic = uniques.str.contains(ACADEMIC_PATTERN).to_numpy(dtype=bool)[codes]
+
+    verdicts = pd.DataFrame({
+        "has_company_keyword": has_company_keyword,
+        "is_academic": is_academic,
+        "is_non_academic": has_company_keyword & ~is_academic
+    }, index=exploded.index).groupby(level=0).any()
+    verdicts.index = affiliations.index
+    return verdicts
+
+
+def read_table(path: Union[str, Path]) -> pd.DataFrame:
+    """Read a CSV, JSON-lines or Parquet file, chosen by extension."""
+    import pandas as pd
+
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        require_pyarrow()
+        return pd.read_parquet(path)
+    if suffix in (".jsonl", ".ndjson"):
+        return pd.read_json(path, lines=True, dtype=False)
+    return pd.read_csv(path, encoding="utf-8-sig")
+
+
+def write_table(df: pd.DataFrame, path: Union[str, Path]):
+    """Write a CSV, JSON-lines or Parquet file, chosen by extension."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".parquet":
+        require_pyarrow()
+        df.to_parquet(path, index=False)
+    elif suffix in (".jsonl", ".ndjson"):
+        df.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+
+
+def rescore_table(df: pd.DataFrame, column: str = AFFILIATION_COLUMN, only_non_academic: bool = False) -> pd.DataFrame:
+    """Replace any previous verdict columns on ``df`` with fresh ones for ``column``."""
+    import numpy as np
+    import pandas as pd
+
+    verdicts = classify_affiliation_column(df[column])
+    # "is_company" is what has_company_keyword was called in older rescored files.
+    stale = [*verdicts.columns, "is_company"]
+    rescored = pd.concat([df.drop(columns=stale, errors="ignore"), verdicts], axis=1)
+    if only_non_academic:
+        rescored = rescored[np.asarray(verdicts["is_non_academic"])].reset_index(drop=True)
+    return rescored
@@ -0,0 +1,341 @@
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Hashable, Iterable, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from pubmed_fetcher import pubmed_fetcher
+from pubmed_fetcher.cache import ArticleCache
+from pubmed_fetcher.client import EutilsClient, get_default_client
+from pubmed_fetcher.index import ArticleIndex
+from pubmed_fetcher.organizations import OrganizationResolver
+from pubmed_fetcher.records import PaperRecord
+
+
+DEFAULT_LRU_SIZE = 10000
+
+
+class ArticleLRU:
+    """In-memory LRU of parsed articles, keyed by PMID.
+
+    A PMID maps to its :class:`PaperRecord`, or to None once it is known to
+    have no non-academic authors, so neither kind is fetched twice while it
+    stays among the ``max_size`` most recently used.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_LRU_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Optional[PaperRecord]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, pmids: Iterable[str]) -> Dict[str, Optional[PaperRecord]]:
+        """Return the known entries among ``pmids``; absent PMIDs are misses."""
+        found = {}
+        with self._lock:
+            for pmid in pmids:
+                if pmid in self._entries:
+                    self._entries.move_to_end(pmid)
+                    found[pmid] = self._entries[pmid]
+                    self.hits += 1
+                else:
+                    self.misses += 1
+        return found
+
+    def put_many(self, entries: Dict[str, Optional[PaperRecord]]):
+        with self._lock:
+            self._entries.update(entries)
+            for pmid in entries:
+                self._entries.move_to_end(pmid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _Flight:
+    """Batches of one upstream call, replayed to every request that joined it."""
+
+    def __init__(self):
+        self.batches: List[list] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self._changed = threading.Condition()
+
+    def publish(self, batch: list):
+        with self._changed:
+            self.batches.append(batch)
+            self._changed.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None):
+        with self._changed:
+            self.done = True
+            self.error = error
+            self._changed.notify_all()
+
+    def follow(self) -> Iterator[list]:
+        """Yield every batch from the first, then each new one as it lands."""
+        position = 0
+        while True:
+            with self._changed:
+                self._changed.wait_for(lambda: self.done or len(self.batches) > position)
+                pending = self.batches[position:]
+                done, error = self.done, self.error
+            position += len(pending)
+            yield from pending
+            if done and position == len(self.batches):
+                if error is not None:
+                    raise error
+                return
+
+
+class Coalescer:
+    """Share one upstream call between concurrent identical requests.
+
+    The first request for a key starts ``produce`` on a background thread;
+    requests for the same key that arrive before it finishes follow the
+    same flight instead of starting their own. Running the call off the
+    request thread keeps it going for the followers if its first caller
+    disconnects.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def join(self, key: Hashable, produce: Callable[[], Iterable[list]]) -> Iterator[list]:
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                return flight.follow()
+            flight = self._flights[key] = _Flight()
+
+        threading.Thread(target=self._run, args=(key, flight, produce), daemon=True).start()
+        return flight.follow()
+
+    def _run(self, key: Hashable, flight: _Flight, produce: Callable[[], Iterable[list]]):
+        error = None
+        try:
+            for batch in produce():
+                flight.publish(batch)
+        except Exception as e:
+            error = e
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.finish(error)
+
+
+class PaperService:
+    """Long-running HTTP/JSON front end to the search and fetch pipeline.
+
+    Keeps one pooled ``client`` and an :class:`ArticleLRU` of parsed
+    articles warm across requests, and coalesces concurrent identical
+    requests into one upstream call. Endpoints:
+
+    * ``GET /ids?query=...&max_results=N`` returns the PMIDs as JSON.
+    * ``GET /search?query=...&max_results=N`` streams papers as NDJSON.
+    * ``POST /papers`` with ``{"pmids": [...]}`` streams papers as NDJSON.
+    * ``GET /stats`` returns request, coalescing and LRU counters.
+
+    ``max_results=all`` pages through every result. Papers are streamed a
+    batch at a time as output-column rows, so clients see the first rows
+    long before a large query finishes.
+    """
+
+    def __init__(
+        self,
+        client: Optional[EutilsClient] = None,
+        cache: Optional[ArticleCache] = None,
+        index: Optional[ArticleIndex] = None,
+        organizations: Optional[OrganizationResolver] = None,
+        lru_size: int = DEFAULT_LRU_SIZE,
+        batch_size: int = pubmed_fetcher.EFETCH_BATCH_SIZE,
+        host: str = "127.0.0.1",
+        port: int = 0
+    ):
+        self.client = client or get_default_client()
+        self.cache = cache
+        self.index = index
+        self.organizations = organizations
+        self.batch_size = batch_size
+        self.lru = ArticleLRU(lru_size)
+        self.coalescer = Coalescer()
+        self.stats = {"requests": 0, "upstream_searches": 0, "upstream_fetches": 0}
+
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "PaperService":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "PaperService":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def search_ids(self, query: str, max_results: Optional[int] = 10) -> List[str]:
+        def produce():
+            self._count("upstream_searches")
+            yield pubmed_fetcher.fetch_pubmed_ids(query, max_results=max_results, client=self.client)
+
+        return [pmid for batch in self.coalescer.join(("ids", query, max_results), produce) for pmid in batch]
+
+    def iter_papers(self, pmids: Iterable[str]) -> Iterator[List[PaperRecord]]:
+        """Yield batches of papers with non-academic authors among ``pmids``.
+
+        Papers already in the LRU come first, in one batch; the rest follow
+        batch by batch as they are fetched.
+        """
+        pmids = tuple(dict.fromkeys(pmids))
+
+        def produce():
+            known = self.lru.get_many(pmids)
+            cached = [known[pmid] for pmid in pmids if known.get(pmid) is not None]
+            if cached:
+                yield cached
+
+            missing = [pmid for pmid in pmids if pmid not in known]
+            if not missing:
+                return
+            self._count("upstream_fetches")
+            found = set()
+            batches = pubmed_fetcher.iter_paper_details(missing, batch_size=self.batch_size, client=self.client, cache=self.cache, index=self.index, organizations=self.organizations)
+            for papers in batches:
+                self.lru.put_many({paper.pmid: paper for paper in papers})
+                found.update(paper.pmid for paper in papers)
+                yield papers
+            self.lru.put_many({pmid: None for pmid in missing if pmid not in found})
+
+        return self.coalescer.join(("papers", pmids), produce)
+
+    def iter_search(self, query: str, max_results: Optional[int] = 10) -> Iterator[List[PaperRecord]]:
+        return self.iter_papers(self.search_ids(query, max_results=max_results))
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            summary = dict(self.stats)
+        summary.update(
+            coalesced=self.coalescer.coalesced,
+            lru_size=len(self.lru),
+            lru_hits=self.lru.hits,
+            lru_misses=self.lru.misses
+        )
+        return summary
+
+    def _count(self, key: str, amount: int = 1):
+        with self._lock:
+            self.stats[key] += amount
+
+
+def _upstream_error(error: Exception) -> str:
+    """Describe an upstream failure without its message, whose request URL carries the API key."""
+    response = getattr(error, "response", None)
+    if response is not None:
+        return f"upstream E-utilities request failed with HTTP {response.status_code}"
+    return f"upstream E-utilities request failed ({type(error).__name__})"
+
+
+def _handler(service: PaperService):
+    class Handler(BaseHTTPRequestHandler):
+        # Keep client connections open between requests; streams are chunked.
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            service._count("requests")
+            url = urlparse(self.path)
+            params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+            if url.path == "/stats":
+                self._send_json(200, service.summary())
+                return
+            if url.path not in ("/ids", "/search"):
+                self._send_json(404, {"error": f"unknown endpoint {url.path}"})
+                return
+            if not params.get("query"):
+                self._send_json(400, {"error": "missing query parameter"})
+                return
+
+            max_results = params.get("max_results", "10")
+            if max_results != "all" and not max_results.isdigit():
+                self._send_json(400, {"error": "max_results must be a number or 'all'"})
+                return
+            max_results = None if max_results == "all" else int(max_results)
+
+            if url.path == "/ids":
+                try:
+                    pmids = service.search_ids(params["query"], max_results=max_results)
+                except Exception as e:
+                    self._send_json(502, {"error": _upstream_error(e)})
+                    return
+                self._send_json(200, {"query": params["query"], "pmids": pmids})
+            else:
+                self._stream(lambda: service.iter_search(params["query"], max_results=max_results))
+
+        def do_POST(self):
+            service._count("requests")
+            if urlparse(self.path).path != "/papers":
+                self._send_json(404, {"error": f"unknown endpoint {self.path}"})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                pmids = [str(pmid) for pmid in json.loads(self.rfile.read(length) or b"{}")["pmids"]]
+            except (ValueError, KeyError, TypeError):
+                self._send_json(400, {"error": "body must be JSON like {\"pmids\": [...]}"})
+                return
+            self._stream(lambda: service.iter_papers(pmids))
+
+        def _stream(self, batches: Callable[[], Iterator[List[PaperRecord]]]):
+            """Send each batch as one NDJSON chunk; an upstream failure ends the stream with an error line."""
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            try:
+                for papers in batches():
+                    if papers:
+                        self._chunk("".join(json.dumps(paper.to_row(), ensure_ascii=False) + "\n" for paper in papers))
+            except Exception as e:
+                self._chunk(json.dumps({"error": _upstream_error(e)}) + "\n")
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _chunk(self, text: str):
+            body = text.encode("utf-8")
+            self.wfile.write(f"{len(body):x}\r\n".encode("ascii") + body + b"\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,157 @@
+import csv
+import importlib.util
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from pubmed_fetcher.metrics import METRICS
+from pubmed_fetcher.records import PaperRecord
+
+
+# Parquet support is the optional ``parquet`` extra.
+PARQUET_HINT = "Parquet files need pyarrow: pip install 'pubmed-fetcher[parquet]'"
+
+
+def require_pyarrow():
+    """Raise ImportError pointing at the ``parquet`` extra if pyarrow is missing, without importing it."""
+    if importlib.util.find_spec("pyarrow") is None:
+        raise ImportError(PARQUET_HINT)
+
+
+class Sink:
+    """Destination that paper records are streamed into one batch at a time.
+
+    Subclasses implement :meth:`_open` and :meth:`_write`, which receive
+    records already flattened to output-column dicts (plain dicts pass
+    through unchanged). The output is only opened once the first non-empty
+    batch arrives, so a run that finds nothing leaves no file behind.
+    ``count`` is the number of records written so far. Formats that can
+    hold a list set ``affiliation_list`` to keep each company affiliation
+    separate (see :meth:`PaperRecord.to_row`).
+    """
+
+    flatten = True
+    affiliation_list = False
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path is not None else None
+        self.count = 0
+        self._opened = False
+
+    def write(self, records: List[Union[PaperRecord, Dict]]):
+        if not records:
+            return
+        if self.flatten:
+            records = [record.to_row(self.affiliation_list) if isinstance(record, PaperRecord) else record for record in records]
+        with METRICS.timer("write"):
+            if not self._opened:
+                self._open(records)
+                self._opened = True
+            self._write(records)
+        self.count += len(records)
+        METRICS.increment("records_written", len(records))
+
+    def _open(self, first: List[Dict]):
+        pass
+
+    def _write(self, records: List[Dict]):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "Sink":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class MemorySink(Sink):
+    """Collect records, unflattened, in ``records`` for callers that want a list back."""
+
+    flatten = False
+
+    def __init__(self):
+        super().__init__()
+        self.records: List[PaperRecord] = []
+
+    def _write(self, records: List[Dict]):
+        self.records.extend(records)
+
+
+class CsvSink(Sink):
+    """Stream records to a CSV file whose header comes from the first record."""
+
+    def _open(self, first: List[Dict]):
+        self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.DictWriter(self._file, fieldnames=list(first[0]))
+        self._writer.writeheader()
+
+    def _write(self, records: List[Dict]):
+        self._writer.writerows(records)
+        self._file.flush()
+
+    def close(self):
+        if self._opened:
+            self._file.close()
+
+
+class JsonlSink(Sink):
+    """Stream records to a newline-delimited JSON file, one object per line."""
+
+    affiliation_list = True
+
+    def _open(self, first: List[Dict]):
+        self._file = open(self.path, "w", encoding="utf-8")
+
+    def _write(self, records: List[Dict]):
+        self._file.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        self._file.flush()
+
+    def close(self):
+        if self._opened:
+            self._file.close()
+
+
+class ParquetSink(Sink):
+    """Stream records to a Parquet file, appending one row group per batch.
+
+    Needs the optional ``pyarrow`` package (the ``parquet`` extra), checked
+    when the sink is created so a run fails before any fetching. The schema
+    is inferred from the first batch.
+    """
+
+    affiliation_list = True
+
+    def __init__(self, path: Union[str, Path]):
+        require_pyarrow()
+        super().__init__(path)
+
+    def _open(self, first: List[Dict]):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self._pa = pa
+        self._schema = pa.Table.from_pylist(first).schema
+        self._writer = pq.ParquetWriter(self.path, self._schema)
+
+    def _write(self, records: List[Dict]):
+        self._writer.write_table(self._pa.Table.from_pylist(records, schema=self._schema))
+
+    def close(self):
+        if self._opened:
+            self._writer.close()
+
+
+SINKS_BY_SUFFIX = {
+    ".csv": CsvSink,
+    ".jsonl": JsonlSink,
+    ".ndjson": JsonlSink,
+    ".parquet": ParquetSink
+}
+
+
+def open_sink(filename: Union[str, Path]) -> Sink:
+    """Return the sink for ``filename``, picked by its extension (CSV if unknown)."""
+    return SINKS_BY_SUFFIX.get(Path(filename).suffix.lower(), CsvSink)(filename)
@@ -0,0 +1,55 @@
+from pathlib import Path
+from urllib.parse import parse_qs
+
+import pytest
+
+from pubmed_fetcher import mockserver
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.mockserver import article_set, author_element, pubmed_article
+from pubmed_fetcher.pubmed_fetcher import PUBMED_DETAILS_URL
+
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+FIXTURE_FILES = sorted(REPO_ROOT.glob("debug_*.xml"))
+
+
+@pytest.fixture
+def recorded_articles():
+    """Map of PMID -> recorded ``<PubmedArticle>`` XML from the checked-in debug payloads."""
+    return mockserver.recorded_articles(REPO_ROOT)
+
+
+@pytest.fixture
+def company_article():
+    """Build a synthetic article with one company and one academic author."""
+    return lambda pmid="99999999": pubmed_article(pmid, [
+        author_element("Smith", "Genentech Inc., South San Francisco, CA, USA.", "Jane"),
+        author_element("Doe", "Department of Biology, Stanford University, Stanford, CA, USA.", "John", "john.doe@stanford.edu")
+    ], title="CRISPR screening in industrial cell lines.")
+
+
+@pytest.fixture
+def efetch(requests_mock, company_article):
+    """Serve EFetch from a PMID -> ``<PubmedArticle>`` mapping.
+
+    Without a mapping every PMID gets a synthetic :func:`company_article`.
+    Returns the list the requested PMID batches are recorded in.
+    """
+    def serve(articles=None):
+        requested = []
+
+        def respond(request, context):
+            ids = parse_qs(request.text)["id"][0].split(",")
+            requested.append(ids)
+            return article_set(*(company_article(pmid) if articles is None else articles[pmid] for pmid in ids))
+
+        requests_mock.post(PUBMED_DETAILS_URL, text=respond)
+        return requested
+    return serve
+
+
+@pytest.fixture
+def client():
+    """An unthrottled client so offline tests are not paced at NCBI's rate limit."""
+    with EutilsClient(rate_limit=None) as client:
+        yield client
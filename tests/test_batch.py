@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+from typer.testing import CliRunner
+
+from pubmed_fetcher.batch import QUERY_COLUMN, fetch_query_batch, papers_by_query, query_output_path, read_queries
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.pubmed_fetcher import PUBMED_API_URL
+
+HITS = {
+    "crispr": ["90000001", "90000002"],
+    "gene editing": ["90000002", "90000003"],
+    "base editing": ["90000003"],
+}
+
+
+@pytest.fixture
+def eutils(requests_mock, efetch):
+    """Serve ``HITS`` from esearch and record the PMID batches every efetch asks for."""
+    def search(request, context):
+        ids = HITS[request.qs["term"][0]]
+        return {"esearchresult": {"count": str(len(ids)), "idlist": ids}}
+
+    requests_mock.get(PUBMED_API_URL, json=search)
+    return efetch()
+
+
+def test_read_queries_skips_comments_blanks_and_repeats(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("# saved searches\ncrispr\n\ngene editing\ncrispr\n", encoding="utf-8")
+
+    assert read_queries(path) == ["crispr", "gene editing"]
+
+
+def test_overlapping_hits_are_fetched_once_and_fanned_out(eutils, client):
+    papers, membership = fetch_query_batch(HITS, client=client, concurrency=3)
+
+    assert sorted(pmid for batch in eutils for pmid in batch) == ["90000001", "90000002", "90000003"]
+    assert [paper.pmid for paper in papers] == ["90000001", "90000002", "90000003"]
+    assert membership["90000002"] == ["crispr", "gene editing"]
+
+    grouped = papers_by_query(papers, membership)
+    assert [paper.pmid for paper in grouped["gene editing"]] == ["90000002", "90000003"]
+    assert [paper.pmid for paper in grouped["base editing"]] == ["90000003"]
+
+
+def test_batch_command_writes_per_query_files_with_membership(tmp_path, eutils):
+    (tmp_path / "queries.txt").write_text("\n".join(HITS), encoding="utf-8")
+
+    result = CliRunner().invoke(app, [
+        "batch", str(tmp_path / "queries.txt"), "-o", str(tmp_path / "out"), "-f", str(tmp_path / "all.csv"),
+        "--no-cache", "--no-index", "--organizations-path", str(tmp_path / "organizations.sqlite3")
+    ])
+    assert result.exit_code == 0, result.output
+
+    assert sum(map(len, eutils)) == 3
+    combined = pd.read_csv(tmp_path / "all.csv", encoding="utf-8-sig", dtype=str)
+    assert list(combined[QUERY_COLUMN]) == ["crispr", "crispr; gene editing", "gene editing; base editing"]
+    assert set(combined["Company Name(s)"]) == {"Genentech"}
+
+    gene_editing = pd.read_csv(query_output_path(tmp_path / "out", 2, "gene editing"), encoding="utf-8-sig", dtype=str)
+    assert list(gene_editing["PubmedID"]) == ["90000002", "90000003"]
@@ -0,0 +1,20 @@
+from benchmarks.run import BENCHMARKS, main, regressions, run
+
+
+def test_benchmarks_run_offline_and_report_throughput():
+    results = run(list(BENCHMARKS), repeat=1)
+
+    for name, result in results.items():
+        assert result["items"] > 0, name
+        assert result["items_per_s"] > 0, name
+        assert result["peak_mib"] >= 0, name
+
+
+def test_compare_flags_throughput_regressions(tmp_path):
+    baseline = {"parse_synthetic": {"items_per_s": 1000.0}, "classify_warm": {"items_per_s": 1000.0}}
+    results = {"parse_synthetic": {"items_per_s": 700.0}, "classify_warm": {"items_per_s": 900.0}}
+    assert regressions(results, baseline, tolerance=0.2) == ["parse_synthetic"]
+
+    saved = tmp_path / "baseline.json"
+    assert main(["classify_warm", "--repeat", "1", "--json", str(saved)]) == 0
+    assert main(["classify_warm", "--repeat", "1", "--compare", str(saved), "--tolerance", "0.99"]) == 0
@@ -0,0 +1,47 @@
+from pubmed_fetcher import cache as cache_module
+from pubmed_fetcher.cache import ArticleCache
+from pubmed_fetcher.pubmed_fetcher import fetch_paper_details
+
+
+def test_cache_expires_entries_after_ttl(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+
+    with ArticleCache(tmp_path / "cache", ttl=60) as cache:
+        cache.put_many({"1": b"<PubmedArticle/>"})
+        assert cache.get_many(["1", "2"]) == {"1": b"<PubmedArticle/>"}
+
+        clock[0] += 61
+        assert cache.get_many(["1"]) == {}
+        assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_evicts_least_recently_read(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(cache_module.time, "time", lambda: clock[0])
+    payload = lambda pmid: f"<PubmedArticle>{pmid}</PubmedArticle>".encode("utf-8")
+
+    with ArticleCache(tmp_path / "cache") as cache:
+        cache.put_many({pmid: payload(pmid) for pmid in ("1", "2")})
+        cache.max_bytes = len(cache._db.execute("SELECT xml FROM articles").fetchone()[0]) * 2
+
+        clock[0] += 1
+        cache.get_many(["1"])
+        clock[0] += 1
+        cache.put_many({"3": payload("3")})
+
+        assert sorted(cache.get_many(["1", "2", "3"])) == ["1", "3"]
+
+
+def test_fetch_paper_details_skips_network_for_cached_articles(tmp_path, efetch, client, company_article):
+    articles = {str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000004)}
+    requested = efetch(articles)
+
+    with ArticleCache(tmp_path / "cache") as cache:
+        first = fetch_paper_details(list(articles)[:2], client=client, cache=cache)
+        second = fetch_paper_details(list(articles), client=client, cache=cache)
+
+        assert requested == [["90000000", "90000001"], ["90000002", "90000003"]]
+        assert second[:2] == first
+        assert [paper.pmid for paper in second] == list(articles)
+        assert (cache.hits, cache.misses) == (2, 4)
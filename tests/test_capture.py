@@ -0,0 +1,58 @@
+import gzip
+import threading
+
+import pytest
+
+from pubmed_fetcher.capture import DebugCapture
+from pubmed_fetcher.pubmed_fetcher import fetch_paper_details
+
+
+@pytest.fixture
+def articles(efetch, company_article):
+    """Serve synthetic articles; 90000009 comes back truncated, failing its batch."""
+    articles = {str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000010)}
+    articles["90000009"] = articles["90000009"][:-40]
+    efetch(articles)
+
+
+def test_fetch_writes_nothing_without_capture(tmp_path, monkeypatch, articles, client):
+    monkeypatch.chdir(tmp_path)
+    fetch_paper_details([str(pmid) for pmid in range(90000000, 90000005)], client=client)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_capture_samples_articles_and_keeps_failures(tmp_path, articles, client):
+    pmids = [str(pmid) for pmid in range(90000000, 90000010)]
+
+    with DebugCapture(tmp_path / "captures", sample=3) as capture:
+        fetch_paper_details(pmids, batch_size=5, client=client, capture=capture)
+
+    names = sorted(path.name for path in (tmp_path / "captures").iterdir())
+    sampled = [f"{pmid}.xml.gz" for pmid in pmids[:5] if capture.wants(pmid)]
+    assert 0 < len(sampled) < 5
+    assert names == sorted(sampled + ["failed_90000005-90000009.error.txt.gz", "failed_90000005-90000009.xml.gz"])
+
+    article = gzip.decompress((tmp_path / "captures" / sampled[0]).read_bytes()).decode("utf-8")
+    assert article.startswith("<PubmedArticle>")
+
+
+def test_failures_only_capture(tmp_path, articles, client):
+    with DebugCapture(tmp_path / "captures", failures_only=True) as capture:
+        fetch_paper_details([str(pmid) for pmid in range(90000005, 90000010)], client=client, capture=capture)
+
+    assert capture.written == 2
+
+
+def test_failed_writes_are_counted_and_close_does_not_hang(tmp_path):
+    capture = DebugCapture(tmp_path / "debug", max_pending=3)
+    (tmp_path / "debug" / "1.xml.gz").mkdir()
+
+    for pmid in range(1, 11):
+        capture.articles({str(pmid): b"<PubmedArticle/>"})
+    closer = threading.Thread(target=capture.close)
+    closer.start()
+    closer.join(timeout=5)
+
+    assert not closer.is_alive()
+    assert capture.failed == 1
+    assert capture.written + capture.failed + capture.dropped == 10
@@ -0,0 +1,22 @@
+from pubmed_fetcher.classifier import classify_affiliations, is_company_affiliation
+
+
+def test_keywords_only_match_at_word_starts():
+    assert classify_affiliations([
+        "Genentech Inc., South San Francisco, CA, USA.",
+        "Novartis Pharmaceuticals Corporation, East Hanover, NJ, U.S.A.",
+        "Department of Physics, Princeton, NJ, USA.",
+        "Health Bureau of Sichuan Province, Chengdu, China.",
+        "Centre for Genomics, Lisbon, U.S.A.",
+    ]) == [True, True, False, False, False]
+
+
+def test_academic_keywords_override_company_keywords():
+    assert not is_company_affiliation("Biotech Research Center, Harvard Medical School, Boston, MA.")
+    assert not is_company_affiliation("")
+
+
+def test_verdicts_are_memoized():
+    is_company_affiliation.cache_clear()
+    classify_affiliations(["Roche Diagnostics GmbH, Penzberg, Germany."] * 3)
+    assert is_company_affiliation.cache_info().hits == 2
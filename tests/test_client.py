@@ -0,0 +1,65 @@
+import io
+
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError
+
+from pubmed_fetcher import client as client_module
+from pubmed_fetcher.client import EutilsClient
+
+URL = "https://eutils.example/esearch.fcgi"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff sleeps instead of waiting them out."""
+    delays = []
+    monkeypatch.setattr(client_module.time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_throttled_request_honouring_retry_after(requests_mock, sleeps):
+    requests_mock.get(URL, [
+        {"status_code": 429, "headers": {"Retry-After": "2"}},
+        {"status_code": 503},
+        {"json": {"ok": True}},
+    ])
+    client = EutilsClient(rate_limit=None, backoff=0.1)
+
+    assert client.get(URL).json() == {"ok": True}
+    assert client.retry_count == 2
+    assert sleeps[0] == 2.0
+    assert 0.05 <= sleeps[1] <= 0.2
+
+
+def test_gives_up_after_max_retries(requests_mock, sleeps):
+    requests_mock.get(URL, status_code=500)
+    client = EutilsClient(rate_limit=None, max_retries=2)
+
+    with pytest.raises(requests.HTTPError):
+        client.get(URL)
+    assert requests_mock.call_count == 3
+
+
+def test_client_errors_are_not_retried(requests_mock, sleeps):
+    requests_mock.get(URL, status_code=400)
+
+    with pytest.raises(requests.HTTPError):
+        EutilsClient(rate_limit=None).get(URL)
+    assert requests_mock.call_count == 1
+
+
+class DroppedBody(io.BytesIO):
+    """A response body whose connection resets on the first read."""
+
+    def read(self, *args):
+        raise ProtocolError("Connection broken: connection reset by peer")
+
+
+def test_post_stream_retries_a_body_dropped_mid_read(requests_mock, sleeps):
+    requests_mock.post(URL, [{"body": DroppedBody()}, {"content": b"<PubmedArticleSet/>"}])
+    client = EutilsClient(rate_limit=None)
+
+    assert client.post_stream(URL, lambda response: response.raw.read()) == b"<PubmedArticleSet/>"
+    assert client.retry_count == 1
+    assert requests_mock.call_count == 2
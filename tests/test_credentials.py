@@ -0,0 +1,53 @@
+import pytest
+
+from pubmed_fetcher.client import NCBI_KEYED_RATE_LIMIT, NCBI_RATE_LIMIT, EutilsClient
+from pubmed_fetcher.credentials import DEFAULT_TOOL, NcbiCredentials, load_credentials
+
+URL = "https://eutils.example/efetch.fcgi"
+
+
+@pytest.fixture(autouse=True)
+def _clear_env(monkeypatch):
+    for name in ("NCBI_API_KEY", "NCBI_EMAIL", "NCBI_TOOL"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_arguments_override_env_which_overrides_config_file(tmp_path, monkeypatch):
+    config = tmp_path / "config.ini"
+    config.write_text("[ncbi]\napi_key = from-file\nemail = file@example.org\ntool = file-tool\n")
+    monkeypatch.setenv("NCBI_EMAIL", "env@example.org")
+
+    credentials = load_credentials(tool="cli-tool", config_path=config)
+
+    assert credentials == NcbiCredentials(api_key="from-file", email="env@example.org", tool="cli-tool")
+
+
+def test_missing_config_file_falls_back_to_anonymous(tmp_path):
+    credentials = load_credentials(config_path=tmp_path / "absent.ini")
+
+    assert not credentials.keyed
+    assert credentials.params() == {"tool": DEFAULT_TOOL}
+
+
+def test_client_sends_credentials_on_every_request(requests_mock):
+    requests_mock.get(URL, text="ok")
+    requests_mock.post(URL, text="ok")
+    credentials = NcbiCredentials(api_key="secret", email="me@example.org")
+    client = EutilsClient(rate_limit=None, credentials=credentials)
+
+    client.get(URL, params={"db": "pubmed"})
+    client.post(URL, data={"id": "1,2"})
+
+    get, post = requests_mock.request_history
+    assert get.qs == {"db": ["pubmed"], "api_key": ["secret"], "email": ["me@example.org"], "tool": [DEFAULT_TOOL]}
+    assert "api_key=secret" in post.text and "id=1%2C2" in post.text
+
+
+def test_api_key_selects_the_keyed_rate_tier():
+    keyed = EutilsClient(credentials=NcbiCredentials(api_key="secret"))
+    anonymous = EutilsClient()
+
+    assert keyed.rate_limit == NCBI_KEYED_RATE_LIMIT
+    assert anonymous.rate_limit == NCBI_RATE_LIMIT
+    assert keyed.tier == "keyed (10 req/s)"
+    assert anonymous.tier == "anonymous (3 req/s)"
@@ -16,9 +16,9 @@ def test_fetch_paper_details():
     
     assert isinstance(papers, list), "Expected a list of paper details"
     if papers:
-        assert "PubmedID" in papers[0], "Missing PubmedID in results"
-        assert "Title" in papers[0], "Missing Title in results"
-        assert "Publication Date" in papers[0], "Missing Publication Date"
+        assert papers[0].pmid, "Missing PubmedID in results"
+        assert papers[0].title, "Missing Title in results"
+        assert papers[0].pub_date, "Missing Publication Date"
 
 def test_filtering_logic():
     """Test if filtering correctly excludes academic authors."""
@@ -26,4 +26,4 @@ def test_filtering_logic():
     papers = fetch_paper_details(sample_ids)
 
     for paper in papers:
-        assert paper["Non-academic Author(s)"] != "N/A", "Academic-only papers should be filtered out"
+        assert paper.company_authors, "Academic-only papers should be filtered out"
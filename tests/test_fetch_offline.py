@@ -0,0 +1,105 @@
+import asyncio
+import threading
+from pubmed_fetcher import pubmed_fetcher
+from pubmed_fetcher.cache import ArticleCache
+from pubmed_fetcher.pubmed_fetcher import (
+    PUBMED_API_URL,
+    aiter_paper_details,
+    async_fetch_paper_details,
+    fetch_paper_details,
+    fetch_pubmed_ids,
+    iter_pubmed_ids,
+)
+
+
+def test_fetch_paper_details_batches_ids(efetch, client, recorded_articles, company_article):
+    """IDs are POSTed in comma-joined batches and the article set is split per article."""
+    pmids = sorted(recorded_articles) + ["99999999"]
+    articles = dict(recorded_articles, **{"99999999": company_article()})
+    requested = efetch(articles)
+
+    papers = fetch_paper_details(pmids, batch_size=4, client=client)
+
+    assert len(requested) == 3
+    paper = next(p for p in papers if p.pmid == "99999999")
+    assert paper.company_author_names == ("Smith",)
+    assert paper.company_affiliations == ("Genentech Inc., South San Francisco, CA, USA.",)
+    assert paper.pub_date == "2024"
+
+
+def test_iter_pubmed_ids_pages_with_retstart(requests_mock, client):
+    """The whole result set is walked page by page until ``count`` is reached."""
+    all_ids = [str(40000000 + i) for i in range(7)]
+
+    def respond(request, context):
+        start, size = int(request.qs["retstart"][0]), int(request.qs["retmax"][0])
+        return {"esearchresult": {"count": str(len(all_ids)), "idlist": all_ids[start:start + size]}}
+
+    requests_mock.get(PUBMED_API_URL, json=respond)
+
+    assert list(iter_pubmed_ids("crispr", page_size=3, client=client)) == all_ids
+    assert requests_mock.call_count == 3
+    assert fetch_pubmed_ids("crispr", max_results=4, client=client) == all_ids[:4]
+
+
+def test_async_fetch_matches_sequential(efetch, client, company_article):
+    """The concurrent fetcher returns the same records, in order, as the sequential one."""
+    articles = {str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000010)}
+    requested = efetch(articles)
+
+    papers = asyncio.run(async_fetch_paper_details(iter(articles), batch_size=3, concurrency=3, client=client))
+
+    assert len(requested) == 4
+    assert papers == fetch_paper_details(articles, batch_size=3, client=client)
+
+
+def test_async_fetch_cancels_pending_batches_when_closed_early(efetch, client, company_article):
+    efetch({str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000010)})
+
+    async def first_batch():
+        batches = aiter_paper_details([str(pmid) for pmid in range(90000000, 90000010)], batch_size=2, concurrency=3, client=client)
+        papers = await batches.__anext__()
+        await batches.aclose()
+        return papers, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    papers, leftover = asyncio.run(first_batch())
+    assert [paper.pmid for paper in papers] == ["90000000", "90000001"]
+    assert leftover == []
+
+
+def test_async_fetch_runs_every_batch_concurrently(monkeypatch, client):
+    """``concurrency`` is not capped by the event loop's default executor size."""
+    pmids = [str(pmid) for pmid in range(90000000, 90000040)]
+    # Every batch waits until all 40 are in flight at once.
+    barrier = threading.Barrier(len(pmids), timeout=10)
+
+    def fetch_and_parse(batch, *args):
+        barrier.wait()
+        return []
+
+    monkeypatch.setattr(pubmed_fetcher, "_fetch_and_parse_batch", fetch_and_parse)
+
+    assert asyncio.run(async_fetch_paper_details(pmids, batch_size=1, concurrency=len(pmids), client=client)) == []
+
+
+def test_process_pool_parsing_matches_in_process(tmp_path, efetch, client, company_article):
+    """Parsing in worker processes yields the same records, in order, and still fills the cache."""
+    articles = {str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000007)}
+    efetch(articles)
+    expected = fetch_paper_details(articles, batch_size=2, client=client)
+
+    with ArticleCache(tmp_path / "cache") as cache:
+        assert fetch_paper_details(articles, batch_size=2, client=client, cache=cache, workers=2) == expected
+        assert asyncio.run(async_fetch_paper_details(articles, batch_size=2, concurrency=2, client=client, cache=cache, workers=2)) == expected
+        assert cache.hits == len(articles)
+
+
+def test_process_pool_records_share_interned_affiliations(efetch, client, company_article):
+    """Records unpickled from worker processes are re-interned like locally parsed ones."""
+    articles = {str(pmid): company_article(str(pmid)) for pmid in range(90000000, 90000004)}
+    efetch(articles)
+    papers = fetch_paper_details(articles, batch_size=2, client=client, workers=2)
+
+    affiliations = [author.affiliation for paper in papers for author in paper.authors if author.is_company]
+    assert len(affiliations) > 1
+    assert all(affiliation is affiliations[0] for affiliation in affiliations)
@@ -0,0 +1,90 @@
+from urllib.parse import parse_qs
+
+import pandas as pd
+from typer.testing import CliRunner
+
+from pubmed_fetcher import incremental, pubmed_fetcher
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.incremental import QueryCheckpoint
+from pubmed_fetcher.pubmed_fetcher import PUBMED_API_URL, PUBMED_DETAILS_URL
+from conftest import article_set
+
+
+def test_incremental_search_fetches_delta_and_merges(tmp_path, requests_mock, efetch):
+    searches = []
+
+    def search(request, context):
+        searches.append(request.qs)
+        ids = ["90000002", "90000003"] if "mindate" in request.qs else ["90000001", "90000002"]
+        return {"esearchresult": {"count": str(len(ids)), "idlist": ids}}
+
+    requests_mock.get(PUBMED_API_URL, json=search)
+    efetch()
+
+    args = ["search", "-q", "crispr", "-f", str(tmp_path / "papers.csv"), "--incremental", "--no-cache", "--no-index", "--no-organizations", "--checkpoint-dir", str(tmp_path / "ckpt")]
+    runner = CliRunner()
+    assert runner.invoke(app, args).exit_code == 0
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.output
+
+    assert "mindate" not in searches[0]
+    assert searches[1]["datetype"] == ["mdat"]
+    assert searches[1]["mindate"] == searches[1]["maxdate"]
+    assert "1 new and 1 revised" in result.output
+
+    saved = pd.read_csv(tmp_path / "papers.csv", dtype={"PubmedID": str}, encoding="utf-8-sig")
+    assert sorted(saved["PubmedID"]) == ["90000001", "90000002", "90000003"]
+
+    checkpoint = QueryCheckpoint(tmp_path / "ckpt", "crispr")
+    assert checkpoint.seen == {"90000001", "90000002", "90000003"}
+    assert checkpoint.last_run is not None
+
+
+def test_incremental_search_refetches_revised_articles_past_the_cache(tmp_path, requests_mock, company_article):
+    runs = []
+
+    def search(request, context):
+        ids = ["90000002"] if "mindate" in request.qs else ["90000001", "90000002"]
+        return {"esearchresult": {"count": str(len(ids)), "idlist": ids}}
+
+    def efetch(request, context):
+        ids = parse_qs(request.text)["id"][0].split(",")
+        runs.append(ids)
+        company = "Roche Ltd., Basel." if len(runs) > 1 else "Genentech Inc., South San Francisco, CA, USA."
+        return article_set(*(company_article(pmid).replace("Genentech Inc., South San Francisco, CA, USA.", company) for pmid in ids))
+
+    requests_mock.get(PUBMED_API_URL, json=search)
+    requests_mock.post(PUBMED_DETAILS_URL, text=efetch)
+
+    args = ["search", "-q", "crispr", "-f", str(tmp_path / "papers.csv"), "--incremental", "--cache-dir", str(tmp_path / "cache"),
+            "--no-index", "--no-organizations", "--checkpoint-dir", str(tmp_path / "ckpt")]
+    runner = CliRunner()
+    assert runner.invoke(app, args).exit_code == 0
+    result = runner.invoke(app, args)
+    assert result.exit_code == 0, result.output
+
+    assert runs == [["90000001", "90000002"], ["90000002"]]
+    saved = pd.read_csv(tmp_path / "papers.csv", dtype=str, encoding="utf-8-sig").set_index("PubmedID")
+    assert saved.loc["90000002", "Company Affiliation(s)"] == "Roche Ltd., Basel."
+    assert saved.loc["90000001", "Company Affiliation(s)"].startswith("Genentech")
+
+
+def test_truncated_search_does_not_advance_checkpoint(tmp_path, monkeypatch, requests_mock, efetch):
+    monkeypatch.setattr(pubmed_fetcher, "ESEARCH_MAX_RESULTS", 2)
+    monkeypatch.setattr(incremental, "ESEARCH_MAX_RESULTS", 2)
+
+    def search(request, context):
+        start, size = int(request.qs["retstart"][0]), int(request.qs["retmax"][0])
+        return {"esearchresult": {"count": "5", "idlist": [str(90000001 + i) for i in range(start, start + size)]}}
+
+    requests_mock.get(PUBMED_API_URL, json=search)
+    efetch()
+
+    args = ["search", "-q", "crispr", "-f", str(tmp_path / "papers.csv"), "--incremental", "--no-cache", "--no-index",
+            "--no-organizations", "--checkpoint-dir", str(tmp_path / "ckpt")]
+    result = CliRunner().invoke(app, args)
+    assert result.exit_code == 0, result.output
+
+    assert "Checkpoint not advanced" in result.output
+    assert len(pd.read_csv(tmp_path / "papers.csv", encoding="utf-8-sig")) == 2
+    assert QueryCheckpoint(tmp_path / "ckpt", "crispr").last_run is None
@@ -0,0 +1,62 @@
+import io
+import sqlite3
+
+from typer.testing import CliRunner
+
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.index import ArticleIndex
+from pubmed_fetcher.parser import parse_articles
+from pubmed_fetcher.pubmed_fetcher import fetch_paper_details
+from conftest import article_set
+
+
+def test_fetch_populates_index_with_every_article(tmp_path, efetch, client, recorded_articles, company_article):
+    articles = dict(recorded_articles, **{"99999999": company_article()})
+    efetch(articles)
+
+    with ArticleIndex(tmp_path / "index.sqlite3") as index:
+        papers = fetch_paper_details(list(articles), client=client, index=index)
+
+        assert len(index) == len(articles)
+        assert len(index.search(company_only=False)) == len(articles)
+        assert sorted(paper.pmid for paper in index.search()) == sorted(paper.pmid for paper in papers)
+
+        hits = index.search(text="crispr", year=2024, affiliation="genentech")
+        assert [paper.pmid for paper in hits] == ["99999999"]
+        assert hits[0] == next(paper for paper in papers if paper.pmid == "99999999")
+        assert index.search(text="crispr", year=2023) == []
+
+
+def test_query_command_answers_from_index(tmp_path, company_article):
+    path = tmp_path / "index.sqlite3"
+    payload = article_set(company_article("1"), company_article("2")).encode("utf-8")
+    with ArticleIndex(path) as index:
+        index.add_many(parse_articles(io.BytesIO(payload)))
+
+    result = CliRunner().invoke(app, ["query", "--text", "CRISPR", "--year", "2024", "--index-path", str(path), "-f", str(tmp_path / "hits.csv")])
+
+    assert result.exit_code == 0, result.output
+    assert "2 results saved to" in result.output
+    assert (tmp_path / "hits.csv").exists()
+
+
+def test_older_index_gains_author_detail_columns(tmp_path, company_article):
+    path = tmp_path / "index.sqlite3"
+    with sqlite3.connect(path) as db:
+        db.executescript(
+            "CREATE TABLE articles (pmid TEXT PRIMARY KEY, title TEXT NOT NULL, pub_date TEXT NOT NULL,"
+            " year INTEGER, email TEXT NOT NULL, is_company INTEGER NOT NULL);"
+            "CREATE TABLE authors (pmid TEXT NOT NULL, position INTEGER NOT NULL, name TEXT NOT NULL,"
+            " affiliation TEXT NOT NULL, is_company INTEGER NOT NULL, PRIMARY KEY (pmid, position));"
+            "INSERT INTO articles VALUES ('1', 'Old entry', '2020', 2020, 'Unknown', 1);"
+            "INSERT INTO authors VALUES ('1', 0, 'Smith', 'Genentech Inc.', 1);"
+        )
+    db.close()
+
+    with ArticleIndex(path) as index:
+        old, = index.search(affiliation="genentech")
+        assert old.authors[0].affiliations == ()
+
+        paper = next(parse_articles(io.BytesIO(article_set(company_article("2")).encode("utf-8"))))
+        index.add_many([paper])
+        assert index.search(year=2024) == [paper]
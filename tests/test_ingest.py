@@ -0,0 +1,41 @@
+import gzip
+
+import pandas as pd
+from typer.testing import CliRunner
+
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.ingest import iter_dump_files
+from conftest import article_set
+
+
+def write_dump(path, *articles):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write(article_set(*articles))
+    return path
+
+
+def test_iter_dump_files_parallel_matches_sequential(tmp_path, recorded_articles, company_article):
+    paths = [
+        write_dump(tmp_path / "pubmed25n0001.xml.gz", company_article("1"), *recorded_articles.values()),
+        write_dump(tmp_path / "pubmed25n0002.xml.gz", company_article("2"), company_article("3")),
+    ]
+
+    sequential = list(iter_dump_files(paths))
+    assert [[paper.pmid for paper in papers] for _, papers in sequential][1] == ["2", "3"]
+    parallel = list(iter_dump_files(paths, workers=2))
+    assert parallel == sequential
+
+    affiliations = [author.affiliation for _, papers in parallel for paper in papers[:1] for author in paper.authors[:1]]
+    assert affiliations[0] is affiliations[1]
+
+
+def test_ingest_command_writes_output_offline(tmp_path, company_article):
+    dump = write_dump(tmp_path / "pubmed25n0001.xml.gz", company_article("1"), company_article("2"))
+    output = tmp_path / "papers.jsonl"
+
+    result = CliRunner().invoke(app, ["ingest", str(dump), "--file", str(output), "--organizations-path", str(tmp_path / "organizations.sqlite3")])
+
+    assert result.exit_code == 0, result.output
+    saved = pd.read_json(output, lines=True, dtype=False)
+    assert saved["PubmedID"].tolist() == ["1", "2"]
+    assert saved["Company Name(s)"].tolist() == ["Genentech", "Genentech"]
@@ -0,0 +1,55 @@
+from urllib.parse import parse_qs
+
+import pytest
+import requests
+
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.journal import ProgressJournal
+from pubmed_fetcher.records import AuthorRecord, PaperRecord
+from pubmed_fetcher.pubmed_fetcher import PUBMED_DETAILS_URL, fetch_paper_details
+from conftest import article_set
+
+
+def test_journal_replay_ignores_torn_tail(tmp_path):
+    path = tmp_path / "papers.csv.journal"
+    paper = PaperRecord("1", "Title", "2024", (AuthorRecord("Smith", "Genentech Inc., CA.", True),), "Unknown")
+    with ProgressJournal(path) as journal:
+        journal.record(["1", "2"], [paper])
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"pmids": ["3"], "pap')
+
+    with ProgressJournal(path, resume=True) as journal:
+        assert journal.done == {"1", "2"}
+        assert journal.papers == [paper]
+        journal.record(["3"], [])
+
+    assert ProgressJournal(path, resume=True).done == {"1", "2", "3"}
+
+
+def test_fetch_paper_details_resumes_after_failure(tmp_path, requests_mock, company_article):
+    pmids = [str(pmid) for pmid in range(90000000, 90000006)]
+    requested = []
+    fail_on = {"90000002"}
+
+    def respond(request, context):
+        ids = parse_qs(request.text)["id"][0].split(",")
+        requested.append(ids)
+        if fail_on & set(ids):
+            context.status_code = 500
+            return ""
+        return article_set(*(company_article(pmid) for pmid in ids))
+
+    requests_mock.post(PUBMED_DETAILS_URL, text=respond)
+    client = EutilsClient(rate_limit=None, max_retries=0)
+    path = tmp_path / "papers.csv.journal"
+
+    with ProgressJournal(path) as journal, pytest.raises(requests.HTTPError):
+        fetch_paper_details(pmids, batch_size=2, client=client, journal=journal)
+
+    fail_on.clear()
+    requested.clear()
+    with ProgressJournal(path, resume=True) as journal:
+        papers = fetch_paper_details(pmids, batch_size=2, client=client, journal=journal)
+
+    assert requested == [["90000002", "90000003"], ["90000004", "90000005"]]
+    assert [paper.pmid for paper in papers] == pmids
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.metrics import METRICS, Metrics
+from pubmed_fetcher.pubmed_fetcher import PUBMED_API_URL, fetch_paper_details
+
+
+@pytest.fixture
+def eutils(requests_mock, efetch):
+    requests_mock.get(PUBMED_API_URL, json={"esearchresult": {"count": "3", "idlist": ["1", "2", "3"]}})
+    efetch()
+
+
+def test_pipeline_records_stage_timings_and_counters(eutils, client):
+    METRICS.reset()
+    fetch_paper_details(["1", "2", "3"], batch_size=2, client=client, workers=1)
+
+    snapshot = METRICS.snapshot()
+    assert snapshot["calls"]["efetch"] == 2
+    assert snapshot["calls"]["parse"] == 2
+    assert snapshot["calls"]["classify"] == 6
+    assert snapshot["counters"]["articles_parsed"] == 3
+    assert snapshot["counters"]["bytes_received"] > 0
+
+
+def test_prometheus_rendering():
+    metrics = Metrics()
+    metrics.observe("parse", 0.5, calls=2)
+    metrics.increment("cache_hits", 3)
+    metrics.increment("cache_misses", 1)
+
+    text = metrics.to_prometheus()
+    assert 'pubmed_fetcher_stage_seconds_total{stage="parse"} 0.500000' in text
+    assert "pubmed_fetcher_cache_hits_total 3" in text
+    assert metrics.summary()["cache_hit_rate"] == 0.75
+
+
+def test_cli_writes_metrics_and_profile(tmp_path, eutils):
+    metrics, profile = tmp_path / "metrics.json", tmp_path / "profile.txt"
+    args = ["--metrics", str(metrics), "--profile", str(profile), "search", "-q", "crispr", "--no-cache", "--no-index", "--no-organizations"]
+    result = CliRunner().invoke(app, args)
+
+    assert result.exit_code == 0, result.output
+    summary = json.loads(metrics.read_text(encoding="utf-8"))
+    assert summary["calls"]["esearch"] == 1
+    assert summary["counters"]["articles_parsed"] == 3
+    assert "cumulative" in profile.read_text(encoding="utf-8")
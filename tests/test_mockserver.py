@@ -0,0 +1,30 @@
+import pytest
+
+from pubmed_fetcher import pubmed_fetcher
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.mockserver import MockEutilsServer
+from conftest import REPO_ROOT, FIXTURE_FILES
+
+
+@pytest.fixture
+def point_at(monkeypatch):
+    """Redirect the E-utilities URLs, as PUBMED_EUTILS_URL does at import time."""
+    def redirect(server):
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_API_URL", f"{server.url}/esearch.fcgi")
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_DETAILS_URL", f"{server.url}/efetch.fcgi")
+    return redirect
+
+
+def test_fetch_against_mock_server_with_throttling_and_errors(point_at):
+    with MockEutilsServer(REPO_ROOT, result_count=25, throttle_rate=0.3, error_rate=0.1, retry_after=0, seed=1) as server:
+        point_at(server)
+        client = EutilsClient(rate_limit=None, backoff=0.001, max_retries=10)
+
+        pmids = pubmed_fetcher.fetch_pubmed_ids("anything", max_results=None, client=client)
+        papers = pubmed_fetcher.fetch_paper_details(pmids, batch_size=10, client=client)
+
+    assert len(pmids) == 25
+    assert pmids[:len(FIXTURE_FILES)] == sorted(path.stem.split("_")[1] for path in FIXTURE_FILES)
+    assert {paper.pmid for paper in papers} >= set(pmids[len(FIXTURE_FILES):])
+    assert server.stats["articles"] == 25
+    assert client.retry_count == server.stats["throttled"] + server.stats["errors"] > 0
@@ -0,0 +1,57 @@
+import pytest
+
+from pubmed_fetcher.organizations import OrganizationResolver, organization_key, organization_name
+from pubmed_fetcher.pubmed_fetcher import fetch_paper_details
+
+
+@pytest.mark.parametrize("affiliation, name", [
+    ("Pfizer Inc., Groton, CT, USA.", "Pfizer"),
+    ("Genentech, Inc., South San Francisco, CA, USA.", "Genentech"),
+    ("Merck & Co., Inc., Rahway, NJ, USA.", "Merck"),
+    ("Roche Pharma Research and Early Development, F. Hoffmann-La Roche Ltd, Basel, Switzerland.", "F. Hoffmann-La Roche"),
+    ("Moderna Inc., Cambridge, MA, USA. Electronic address: jane@modernatx.com.", "Moderna"),
+    ("Novo Nordisk A/S, Maaloev, Denmark.", "Novo Nordisk"),
+    ("Sanofi S.A., Paris, France", "Sanofi"),
+    ("Sanofi S.A, Paris, France", "Sanofi"),
+    ("Koninklijke Philips N.V.", "Koninklijke Philips"),
+    ("Chiesi Farmaceutici S.p.A.", "Chiesi Farmaceutici"),
+    ("Janssen Biologics B.V.", "Janssen Biologics"),
+    ("Takeda Pharmaceuticals K.K., Tokyo", "Takeda Pharmaceuticals"),
+    ("Boehringer Ingelheim Pharma GmbH & Co. KG, Biberach, Germany", "Boehringer Ingelheim Pharma"),
+    ("Array Therapeutics, Boulder, CO, USA.", "Array Therapeutics"),
+    ("Bioxyne Therapeutics, Adelaide, SA, Australia.", "Bioxyne Therapeutics"),
+    ("Sanofi, S.A., Paris, France", "Sanofi"),
+    ("Department of Biology, Stanford University, Stanford, CA, USA.", ""),
+])
+def test_organization_name_drops_legal_form_and_location(affiliation, name):
+    assert organization_name(affiliation) == name
+
+
+def test_variants_resolve_to_first_spelling_and_persist(tmp_path):
+    path = tmp_path / "organizations.sqlite3"
+    with OrganizationResolver(path) as resolver:
+        names = resolver.resolve_many(["Pfizer Inc., Groton, CT", "PFIZER INC, New York", "Pfizer Inc., Groton, CT"])
+        assert set(names.values()) == {"Pfizer"}
+        assert (resolver.hits, resolver.misses) == (0, 2)
+
+    with OrganizationResolver(path) as resolver:
+        assert resolver.resolve_many(["PFIZER INC, New York", "Pfizer, Inc., Cambridge, MA"]) == {
+            "PFIZER INC, New York": "Pfizer",
+            "Pfizer, Inc., Cambridge, MA": "Pfizer",
+        }
+        assert (resolver.hits, resolver.misses) == (1, 1)
+        assert len(resolver) == 3
+
+    assert organization_key("F. Hoffmann-La Roche") == organization_key("f hoffmann la roche")
+
+
+def test_fetch_fills_company_name_column(tmp_path, efetch, client):
+    efetch()
+
+    with OrganizationResolver(tmp_path / "organizations.sqlite3") as resolver:
+        papers = fetch_paper_details(["1", "2"], client=client, organizations=resolver)
+        assert (resolver.hits, resolver.misses) == (0, 1)
+
+    assert [paper.company_organizations for paper in papers] == [("Genentech",), ("Genentech",)]
+    assert papers[0].to_row()["Company Name(s)"] == "Genentech"
+    assert papers[0].authors[1].organization == ""
@@ -0,0 +1,75 @@
+import io
+import json
+
+from pubmed_fetcher.parser import iter_articles, parse_article, parse_articles
+from pubmed_fetcher.records import PaperRecord
+from conftest import FIXTURE_FILES, article_set
+
+
+def test_iter_articles_streams_and_clears(recorded_articles):
+    payload = article_set(*recorded_articles.values()).encode("utf-8")
+
+    seen = []
+    previous = None
+    for article in iter_articles(io.BytesIO(payload)):
+        if previous is not None:
+            assert len(previous) == 0, "earlier articles should be cleared once the parser moves on"
+        seen.append(article.findtext("MedlineCitation/PMID"))
+        previous = article
+
+    assert seen == sorted(recorded_articles)
+
+
+def test_iter_articles_reads_recorded_payload_with_doctype():
+    pmids = [a.findtext("MedlineCitation/PMID") for a in iter_articles(str(FIXTURE_FILES[0]))]
+    assert pmids == [FIXTURE_FILES[0].stem.split("_")[1]]
+
+
+def test_parse_article_keeps_inline_title_markup(company_article):
+    xml = company_article().replace("CRISPR screening", "<i>CRISPR</i> screening")
+    paper = next(parse_articles(io.BytesIO(article_set(xml).encode("utf-8"))))
+
+    assert paper.title == "CRISPR screening in industrial cell lines."
+    assert paper.company_affiliations == ("Genentech Inc., South San Francisco, CA, USA.",)
+    assert paper.corresponding_email == "john.doe@stanford.edu"
+
+
+MULTI_AFFILIATION_ARTICLE = """<PubmedArticle><MedlineCitation><PMID>12345678</PMID><Article><Journal><JournalIssue><PubDate><Year>2025</Year></PubDate></JournalIssue></Journal><ArticleTitle>Antibody engineering.</ArticleTitle><AuthorList>
+<Author><LastName>Lee</LastName><ForeName>Ana</ForeName><Initials>A</Initials><AffiliationInfo><Affiliation>Department of Chemistry, Harvard University, Cambridge, MA, USA.</Affiliation></AffiliationInfo></Author>
+<Author><LastName>Kim</LastName><ForeName>Min Jun</ForeName><Initials>MJ</Initials><Identifier Source="ORCID">https://orcid.org/0000-0002-1825-009X</Identifier><AffiliationInfo><Affiliation>Harvard Medical School, Boston, MA, USA.</Affiliation></AffiliationInfo><AffiliationInfo><Affiliation>Moderna Inc., Cambridge, MA, USA. Electronic address: mj.kim@modernatx.com.</Affiliation><Identifier Source="ROR">https://ror.org/05e1y6r70</Identifier></AffiliationInfo></Author>
+<Author><CollectiveName>Vaccine Study Group</CollectiveName></Author>
+</AuthorList></Article></MedlineCitation></PubmedArticle>"""
+
+
+def test_parse_article_reads_every_affiliation_email_and_orcid():
+    article = next(iter_articles(io.BytesIO(article_set(MULTI_AFFILIATION_ARTICLE).encode("utf-8"))))
+    paper = parse_article(article)
+
+    lee, kim, group = paper.authors
+    assert not lee.is_company and lee.emails == ()
+    assert kim.is_company
+    assert (kim.fore_name, kim.initials, kim.orcid) == ("Min Jun", "MJ", "0000-0002-1825-009X")
+    assert kim.affiliations == ("Harvard Medical School, Boston, MA, USA.", "Moderna Inc., Cambridge, MA, USA. Electronic address: mj.kim@modernatx.com.")
+    assert kim.affiliation == kim.affiliations[1]
+    assert group.name == "Vaccine Study Group" and group.affiliation == ""
+
+    assert paper.corresponding_author is kim
+    assert paper.corresponding_email == "mj.kim@modernatx.com"
+
+
+
+def test_name_suffix_tells_authors_apart(company_article):
+    xml = company_article().replace("<LastName>Smith</LastName>", "<LastName>Smith</LastName><Suffix>Jr</Suffix>")
+    paper = next(parse_articles(io.BytesIO(article_set(xml).encode("utf-8"))))
+
+    assert [author.name for author in paper.authors] == ["Smith Jr", "Doe"]
+    assert paper.company_author_names == ("Smith Jr",)
+
+def test_author_details_survive_to_dict_and_legacy_triples_still_load():
+    article = next(iter_articles(io.BytesIO(article_set(MULTI_AFFILIATION_ARTICLE).encode("utf-8"))))
+    paper = parse_article(article)
+
+    assert PaperRecord.from_dict(json.loads(json.dumps(paper.to_dict()))) == paper
+
+    legacy = dict(paper.to_dict(), authors=[["Kim", "Moderna Inc., Cambridge, MA, USA.", True]])
+    assert PaperRecord.from_dict(legacy).company_author_names == ("Kim",)
@@ -0,0 +1,13 @@
+import time
+
+from pubmed_fetcher.ratelimit import TokenBucket
+
+
+def test_token_bucket_paces_threads():
+    """Once the initial token is spent, acquires are spaced at 1/rate."""
+    bucket = TokenBucket(rate=50)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - start >= 5 / 50 * 0.9
+
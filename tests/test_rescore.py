@@ -0,0 +1,82 @@
+import io
+from dataclasses import replace
+
+import pandas as pd
+from typer.testing import CliRunner
+
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.parser import parse_articles
+from pubmed_fetcher.records import AuthorRecord
+from pubmed_fetcher.rescore import classify_affiliation_column
+from pubmed_fetcher.sinks import JsonlSink
+from conftest import article_set
+
+
+def test_classify_affiliation_column_broadcasts_unique_verdicts():
+    affiliations = pd.Series(
+        ["Roche Diagnostics GmbH, Penzberg.", None, "Stanford University.", "Roche Diagnostics GmbH, Penzberg.",
+         "Biotech Unit, Yale School of Medicine."],
+        index=[10, 11, 12, 13, 14]
+    )
+
+    verdicts = classify_affiliation_column(affiliations)
+
+    assert list(verdicts.index) == [10, 11, 12, 13, 14]
+    assert verdicts["has_company_keyword"].tolist() == [True, False, False, True, True]
+    assert verdicts["is_academic"].tolist() == [False, False, True, False, True]
+    assert verdicts["is_non_academic"].tolist() == [True, False, False, True, False]
+
+
+def test_rescore_command_rewrites_csv_offline(tmp_path):
+    source = tmp_path / "papers.csv"
+    pd.DataFrame({
+        "PubmedID": ["1", "2"],
+        "Company Affiliation(s)": ["Genentech Inc., CA.", "Department of Physics, Princeton, NJ."]
+    }).to_csv(source, index=False)
+    output = tmp_path / "rescored.csv"
+
+    result = CliRunner().invoke(app, ["rescore", str(source), "--output", str(output), "--only-non-academic"])
+
+    assert result.exit_code == 0, result.output
+    rescored = pd.read_csv(output, dtype={"PubmedID": str}, encoding="utf-8-sig")
+    assert rescored["PubmedID"].tolist() == ["1"]
+    assert rescored["is_non_academic"].all()
+
+
+def test_each_affiliation_is_scored_on_its_own():
+    affiliations = pd.Series([
+        ["Genentech Inc., CA.", "Department of Physics, Princeton University, NJ."],
+        ["Department of Physics, Princeton University, NJ."],
+        [],
+    ])
+
+    verdicts = classify_affiliation_column(affiliations)
+
+    assert verdicts["is_non_academic"].tolist() == [True, False, False]
+    assert verdicts["is_academic"].tolist() == [True, True, False]
+
+
+def test_rescore_command_reads_affiliation_lists_from_jsonl(tmp_path, company_article):
+    paper, = parse_articles(io.BytesIO(article_set(company_article("1")).encode("utf-8")))
+    academic = AuthorRecord("Doe", "Department of Physics, Princeton University, NJ.", True)
+    paper = replace(paper, authors=paper.authors + (academic,))
+    source = tmp_path / "papers.jsonl"
+    with JsonlSink(source) as sink:
+        sink.write([paper])
+
+    result = CliRunner().invoke(app, ["rescore", str(source), "--in-place"])
+
+    assert result.exit_code == 0, result.output
+    rescored = pd.read_json(source, lines=True, dtype=False)
+    assert rescored["Company Affiliation(s)"][0] == ["Genentech Inc., South San Francisco, CA, USA.", academic.affiliation]
+    assert rescored["is_non_academic"].tolist() == [True]
+
+
+def test_rescore_command_needs_output_or_in_place(tmp_path):
+    source = tmp_path / "papers.csv"
+    pd.DataFrame({"PubmedID": ["1"], "Company Affiliation(s)": ["Genentech Inc., CA."]}).to_csv(source, index=False)
+
+    result = CliRunner().invoke(app, ["rescore", str(source)])
+
+    assert result.exit_code == 1
+    assert list(pd.read_csv(source).columns) == ["PubmedID", "Company Affiliation(s)"]
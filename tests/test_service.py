@@ -0,0 +1,90 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from pubmed_fetcher import pubmed_fetcher
+from pubmed_fetcher.client import EutilsClient
+from pubmed_fetcher.credentials import NcbiCredentials
+from pubmed_fetcher.mockserver import MockEutilsServer
+from pubmed_fetcher.service import ArticleLRU, PaperService
+from conftest import REPO_ROOT
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """A slow mock E-utilities, so concurrent identical requests overlap."""
+    with MockEutilsServer(REPO_ROOT, result_count=15, latency=0.3) as server:
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_API_URL", f"{server.url}/esearch.fcgi")
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_DETAILS_URL", f"{server.url}/efetch.fcgi")
+        yield server
+
+
+@pytest.fixture
+def service(client):
+    with PaperService(client=client, batch_size=5) as service:
+        yield service
+
+
+def search(service, query="anything"):
+    response = requests.get(f"{service.url}/search", params={"query": query, "max_results": "all"}, stream=True)
+    response.raise_for_status()
+    return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_concurrent_identical_searches_share_one_upstream_call(upstream, service):
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda _: search(service), range(4)))
+
+    assert all(rows == results[0] for rows in results)
+    assert {row["PubmedID"] for row in results[0]} >= {str(90000000 + i) for i in range(15 - len(upstream.fixtures))}
+    assert upstream.stats["esearch"] == 1
+    assert upstream.stats["articles"] == 15
+    assert service.summary()["coalesced"] == 6
+
+
+def test_warm_lru_answers_repeat_lookups_without_efetch(upstream, service):
+    rows = search(service)
+    efetches = upstream.stats["efetch"]
+
+    response = requests.post(f"{service.url}/papers", json={"pmids": [row["PubmedID"] for row in rows]}, stream=True)
+    repeat = [json.loads(line) for line in response.iter_lines() if line]
+
+    assert repeat == rows
+    assert upstream.stats["efetch"] == efetches
+    assert service.summary()["lru_hits"] == len(rows)
+
+
+def test_bad_requests_are_rejected(service):
+    assert requests.get(f"{service.url}/search").status_code == 400
+    assert requests.get(f"{service.url}/ids", params={"query": "x", "max_results": "many"}).status_code == 400
+    assert requests.post(f"{service.url}/papers", data="not json").status_code == 400
+    assert requests.get(f"{service.url}/nope").status_code == 404
+
+
+def test_lru_evicts_least_recently_used():
+    lru = ArticleLRU(max_size=2)
+    lru.put_many({"1": None, "2": None})
+    lru.get_many(["1"])
+    lru.put_many({"3": None})
+
+    assert set(lru.get_many(["1", "2", "3"])) == {"1", "3"}
+
+
+def test_upstream_errors_do_not_leak_the_api_key(monkeypatch):
+    with MockEutilsServer(REPO_ROOT, error_rate=1.0) as upstream:
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_API_URL", f"{upstream.url}/esearch.fcgi")
+        monkeypatch.setattr(pubmed_fetcher, "PUBMED_DETAILS_URL", f"{upstream.url}/efetch.fcgi")
+        client = EutilsClient(rate_limit=None, max_retries=0, credentials=NcbiCredentials(api_key="SECRETKEY"))
+
+        with PaperService(client=client) as service:
+            ids = requests.get(f"{service.url}/ids", params={"query": "x"})
+            streamed = requests.get(f"{service.url}/search", params={"query": "x"})
+            papers = requests.post(f"{service.url}/papers", json={"pmids": ["1"]})
+
+    assert ids.status_code == 502
+    assert ids.json() == {"error": "upstream E-utilities request failed with HTTP 503"}
+    for response in (ids, streamed, papers):
+        assert "SECRETKEY" not in response.text
+    assert "HTTP 503" in papers.text
@@ -0,0 +1,88 @@
+import json
+import sys
+
+import pytest
+from typer.testing import CliRunner
+
+from pubmed_fetcher.cli import app
+from pubmed_fetcher.records import COLUMNS, AuthorRecord, PaperRecord
+from pubmed_fetcher.rescore import read_table
+from pubmed_fetcher.sinks import PARQUET_HINT, CsvSink, JsonlSink, ParquetSink, open_sink
+
+BATCHES = [
+    [{"PubmedID": "1", "Title": "Alpha, beta", "Company Affiliation(s)": "Genentech Inc., CA."}],
+    [],
+    [{"PubmedID": "2", "Title": "Gamma", "Company Affiliation(s)": "Roche GmbH."},
+     {"PubmedID": "3", "Title": "Delta", "Company Affiliation(s)": "Pfizer Inc."}],
+]
+
+
+@pytest.mark.parametrize("suffix, sink_class", [(".csv", CsvSink), (".jsonl", JsonlSink), (".parquet", ParquetSink)])
+def test_sinks_stream_batches_by_extension(tmp_path, suffix, sink_class):
+    if sink_class is ParquetSink:
+        pytest.importorskip("pyarrow")
+    path = tmp_path / f"papers{suffix}"
+
+    with open_sink(path) as sink:
+        assert type(sink) is sink_class
+        for batch in BATCHES:
+            sink.write(batch)
+
+    assert sink.count == 3
+    table = read_table(path)
+    assert table["PubmedID"].astype(str).tolist() == ["1", "2", "3"]
+    assert table["Title"].tolist() == ["Alpha, beta", "Gamma", "Delta"]
+
+
+def test_parquet_sink_appends_one_row_group_per_batch(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "papers.parquet"
+
+    with ParquetSink(path) as sink:
+        for batch in BATCHES:
+            sink.write(batch)
+
+    assert pq.ParquetFile(path).num_row_groups == 2
+
+
+def test_sink_writes_each_batch_before_close(tmp_path):
+    path = tmp_path / "papers.jsonl"
+
+    with JsonlSink(path) as sink:
+        sink.write(BATCHES[0])
+        assert json.loads(path.read_text(encoding="utf-8"))["PubmedID"] == "1"
+
+
+def test_empty_run_leaves_no_file(tmp_path):
+    with CsvSink(tmp_path / "papers.csv") as sink:
+        sink.write([])
+    assert not (tmp_path / "papers.csv").exists()
+
+
+def test_paper_records_are_flattened_only_at_the_sink(tmp_path):
+    paper = PaperRecord("7", "Epsilon", "2024", (
+        AuthorRecord("Smith", "Genentech, Inc., CA.", True),
+        AuthorRecord("Doe", "Stanford University.", False),
+        AuthorRecord("Lee", "Roche GmbH.", True),
+    ), "Unknown")
+
+    with CsvSink(tmp_path / "papers.csv") as sink:
+        sink.write([paper])
+
+    row = read_table(tmp_path / "papers.csv").iloc[0]
+    assert list(row.index) == list(COLUMNS)
+    assert row["Non-academic Author(s)"] == "Smith, Lee"
+    assert row["Company Affiliation(s)"] == "Genentech, Inc., CA., Roche GmbH."
+    assert paper.company_affiliations == ("Genentech, Inc., CA.", "Roche GmbH.")
+
+
+def test_parquet_without_pyarrow_fails_before_fetching(tmp_path, monkeypatch, requests_mock):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError, match=r"pubmed-fetcher\[parquet\]"):
+        ParquetSink(tmp_path / "papers.parquet")
+
+    result = CliRunner().invoke(app, ["search", "-q", "crispr", "-f", str(tmp_path / "papers.parquet")])
+    assert result.exit_code == 1
+    assert PARQUET_HINT in result.output
+    assert not requests_mock.called
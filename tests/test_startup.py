@@ -0,0 +1,34 @@
+import subprocess
+import sys
+
+from conftest import REPO_ROOT
+
+# Loaded on first use by rescore, incremental merges and Parquet output only.
+HEAVY_MODULES = ("pandas", "numpy", "pyarrow")
+
+# Cumulative microseconds for importing the CLI: about 170-200 ms today,
+# against 540-640 ms when pandas, numpy and pyarrow were imported eagerly.
+IMPORT_BUDGET_US = 300_000
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time per module, in microseconds, from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_leaves_heavy_dependencies_unloaded():
+    times = import_times("pubmed_fetcher.cli")
+
+    loaded = {name.split(".")[0] for name in times}
+    assert not loaded & set(HEAVY_MODULES)
+    assert times["pubmed_fetcher.cli"] < IMPORT_BUDGET_US